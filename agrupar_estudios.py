@@ -4,106 +4,536 @@ Script para agrupar y contar estudios por categoría y subcategoría. Esto se hi
 
 """
 
+import argparse
+import codecs
 import csv
+import hashlib
+import importlib.util
+import io
+import mmap
 import os
+import pickle
 import sys
 from collections import Counter, defaultdict
-from typing import Dict, List, Tuple
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-try:
-    import matplotlib
-    # Usar backend Agg que funciona en todos los entornos (guarda archivos)
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    MATPLOTLIB_DISPONIBLE = True
-except ImportError:
-    MATPLOTLIB_DISPONIBLE = False
+# Numba (y NumPy) solo se importan al recorrer un archivo grande, desde
+# escaneo_numba; aquí basta con saber si está instalado, sin cargarlo
+NUMBA_DISPONIBLE = importlib.util.find_spec("numba") is not None
 
 
 CSV_FILE = "data/este_TCIM_195_scored_final.csv"
 CATEGORY_FIELD = "Category"
 SUBCATEGORY_FIELD = "Subcategory"
-ENCODINGS = ["utf-8", "latin-1", "iso-8859-1", "cp1252", "utf-8-sig"]
+# Codificaciones candidatas, de la más estricta a la más permisiva. El CSV del
+# proyecto está en Mac Roman, que asigna un carácter a cada byte, así que va al
+# final como último recurso (cp1252 o latin-1 lo aceptarían con otras letras)
+ENCODINGS = ["utf-8", "mac_roman"]
+# Buffer de lectura (1 MiB) para reducir el número de llamadas read() en archivos grandes
+TAMANO_BUFFER = 1 << 20
+# Filas que se procesan por bloque; acota la memoria de trabajo durante la agrupación
+TAMANO_BLOQUE_FILAS = 65536
+# Bytes iniciales que se inspeccionan para detectar la codificación
+TAMANO_MUESTRA = 4096
+# A partir de este tamaño compensa compilar el recorrido por bytes con Numba
+UMBRAL_NUMBA_BYTES = 16 * 1024 * 1024
+# A partir de este tamaño se reparte el conteo entre procesos (si hay más de un núcleo)
+UMBRAL_PARALELO_BYTES = 64 * 1024 * 1024
+# Carpeta donde se guardan los conteos ya calculados entre ejecuciones
+CACHE_DIR = ".cache"
+# Cambiar si cambia la forma de agrupar, para no reutilizar cachés antiguas
+CACHE_VERSION = 3
 
 
-def leer_csv(archivo_csv: str) -> List[Dict[str, str]]:
+def detectar_encoding(archivo_csv: str) -> str:
     """
-    Lee el archivo CSV intentando múltiples codificaciones.
+    Elige la codificación del archivo inspeccionando solo sus primeros bytes.
 
     Returns:
-        Lista de filas como diccionarios.
+        'utf-8-sig' si el archivo empieza con BOM; si no, la primera de
+        ENCODINGS que decodifica la muestra sin errores (la última, Mac Roman,
+        si ninguna de las anteriores lo hace).
+    """
+    with open(archivo_csv, "rb") as f:
+        muestra = f.read(TAMANO_MUESTRA)
+
+    if muestra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    for encoding in ENCODINGS[:-1]:
+        try:
+            # final=False tolera un carácter multibyte cortado al final de la muestra
+            codecs.getincrementaldecoder(encoding)().decode(muestra, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+    return ENCODINGS[-1]
+
+
+def iter_csv(archivo_csv: str) -> Iterator[List[str]]:
+    """
+    Recorre el archivo CSV fila a fila con la codificación detectada.
+
+    El archivo se abre y se lee una sola vez, de forma incremental: nunca se
+    materializa la lista completa de filas en memoria.
+
+    Yields:
+        Cada fila como lista de campos; la primera es el encabezado.
     """
     if not os.path.exists(archivo_csv):
         print(f"Error: El archivo '{archivo_csv}' no existe.")
         sys.exit(1)
 
-    for encoding in ENCODINGS:
+    encoding = detectar_encoding(archivo_csv)
+    with open(archivo_csv, "r", encoding=encoding, errors="replace", buffering=TAMANO_BUFFER) as f:
+        yield from csv.reader(f)
+
+
+def indice_columna(encabezado: List[str], campo: str) -> int:
+    """Devuelve la posición de una columna del encabezado o termina si no existe."""
+    try:
+        return encabezado.index(campo)
+    except ValueError:
+        print(f"Error: El archivo no contiene la columna '{campo}'.")
+        sys.exit(1)
+
+
+def separar_pares(pares: Counter) -> Tuple[Counter, Dict[str, Counter], int]:
+    """
+    Convierte un Counter de pares crudos (categoría, subcategoría) en los
+    conteos por categoría y por subcategoría dentro de cada categoría.
+
+    La limpieza de textos (espacios y valores vacíos) se hace aquí, una vez por
+    par distinto, en lugar de una vez por fila. Los textos resultantes se
+    internan para que las búsquedas posteriores por categoría comparen por
+    identidad. El número de filas sale de la misma pasada, sin releer el archivo.
+
+    Returns:
+        Un Counter por categoría, un dict {categoria: Counter(subcategorias)}
+        y el número de filas de datos contadas.
+    """
+    categorias = Counter()
+    subcategorias_por_categoria: Dict[str, Counter] = defaultdict(Counter)
+    n_filas = 0
+
+    for (categoria, subcategoria), count in pares.items():
+        n_filas += count
+        categoria = sys.intern(categoria.strip() or "Sin categoría")
+        subcategoria = sys.intern(subcategoria.strip() or "Sin subcategoría")
+        categorias[categoria] += count
+        subcategorias_por_categoria[categoria][subcategoria] += count
+
+    return categorias, subcategorias_por_categoria, n_filas
+
+
+def contar_pares(filas: Iterable[List[str]]) -> Counter:
+    """
+    Cuenta los pares crudos (categoría, subcategoría) de las filas de un CSV.
+
+    Consume las filas en una sola pasada, actualizando un único contador de
+    pares a medida que se leen. La primera fila debe ser el encabezado; las
+    columnas se resuelven una sola vez y luego se accede por posición. El bucle
+    por fila solo cuenta los valores crudos; la limpieza de textos queda para
+    separar_pares.
+
+    Returns:
+        Un Counter {(categoria, subcategoria): cantidad} sin normalizar.
+    """
+    pares = Counter()
+
+    filas = iter(filas)
+    encabezado = next(filas, None)
+    if encabezado is None:
+        return pares
+
+    ci = indice_columna(encabezado, CATEGORY_FIELD)
+    si = indice_columna(encabezado, SUBCATEGORY_FIELD)
+    minimo = max(ci, si) + 1
+    obtener_par = itemgetter(ci, si)
+
+    # Se procesa por bloques: nunca hay más de TAMANO_BLOQUE_FILAS filas en memoria
+    while True:
+        bloque = list(islice(filas, TAMANO_BLOQUE_FILAS))
+        if not bloque:
+            break
+
         try:
-            with open(archivo_csv, "r", encoding=encoding, errors="replace") as f:
-                reader = csv.DictReader(f)
-                return list(reader)
-        except UnicodeDecodeError:
-            continue
-        except Exception:
+            # Conteo en C (map + itemgetter + Counter) sin bucle de bytecode por fila
+            pares.update(Counter(map(obtener_par, bloque)))
             continue
+        except IndexError:
+            pass
 
-    print("Error: No se pudo leer el archivo con las codificaciones probadas.")
-    sys.exit(1)
+        # El bloque tiene filas vacías o cortas: se recorre fila a fila
+        for fila in bloque:
+            if len(fila) < minimo:
+                # Igual que DictReader: se omiten líneas vacías y se completan filas cortas
+                if not fila:
+                    continue
+                fila = fila + [""] * (minimo - len(fila))
 
+            pares[(fila[ci], fila[si])] += 1
 
-def normalizar_texto(valor: str, texto_vacio: str = "Sin dato") -> str:
-    """Normaliza textos eliminando espacios y valores vacíos."""
-    if valor is None:
-        return texto_vacio
-    limpio = valor.strip()
-    return limpio if limpio else texto_vacio
+    return pares
 
 
-def agrupar_estudios(filas: List[Dict[str, str]]) -> Tuple[Counter, Dict[str, Counter]]:
+def agrupar_estudios(filas: Iterable[List[str]]) -> Tuple[Counter, Dict[str, Counter], int]:
     """
     Agrupa y cuenta los estudios por categoría y subcategoría.
 
+    La primera fila debe ser el encabezado (como la entrega iter_csv).
+
     Returns:
-        Un Counter por categoría y un dict {categoria: Counter(subcategorias)}.
+        Un Counter por categoría, un dict {categoria: Counter(subcategorias)}
+        y el número de filas de datos contadas.
     """
-    categorias = Counter()
-    subcategorias_por_categoria: Dict[str, Counter] = defaultdict(Counter)
+    return separar_pares(contar_pares(filas))
+
+
+def _decodificar_campo(crudo: bytes, encoding: str) -> str:
+    """Convierte los bytes de un campo CSV (posiblemente entre comillas) en su texto."""
+    if crudo.endswith(b"\r"):
+        # Último campo de una línea '\r\n': el '\r' es parte del salto de línea
+        crudo = crudo[:-1]
+    texto = crudo.decode(encoding, errors="replace").replace("\r\n", "\n")
+    if not texto:
+        return ""
+    return next(csv.reader([texto]), [""])[0]
+
+
+def agrupar_bytes(crudo: bytes, encoding: str = ENCODINGS[0]) -> Optional[Tuple[Counter, Dict[str, Counter], int]]:
+    """
+    Variante de agrupar_estudios compilada con Numba para archivos grandes.
+
+    El bucle por filas corre en código nativo y solo agrupa hashes; en Python
+    se decodifica un representante por cada par (categoría, subcategoría)
+    distinto, así que el trabajo interpretado es O(valores únicos).
+
+    Returns:
+        Un Counter por categoría, un dict {categoria: Counter(subcategorias)}
+        y el número de filas de datos contadas, o None si el archivo usa saltos
+        '\r' sueltos, que el recorrido por bytes no separa.
+    """
+    import numpy as np
+    from escaneo_numba import escanear_columnas
+
+    pares = Counter()
+
+    fin_encabezado = crudo.find(b"\n")
+    if fin_encabezado == -1:
+        fin_encabezado = len(crudo)
+    linea_encabezado = crudo[:fin_encabezado].rstrip(b"\r")
+    if b"\r" in linea_encabezado:
+        # Saltos '\r' sueltos (Mac clásico): el modo texto del csv los entiende
+        return None
+    encabezado = next(csv.reader([linea_encabezado.decode(encoding, errors="replace")]), [])
+    ci = indice_columna(encabezado, CATEGORY_FIELD)
+    si = indice_columna(encabezado, SUBCATEGORY_FIELD)
+
+    datos = np.frombuffer(crudo, dtype=np.uint8)
+    hash_c, hash_s, rango_c, rango_s = escanear_columnas(datos, fin_encabezado + 1, ci, si)
+    if hash_c.shape[0] == 0:
+        return separar_pares(pares)
+
+    claves = np.stack((hash_c, hash_s), axis=1)
+    _, primeros, conteos = np.unique(claves, axis=0, return_index=True, return_counts=True)
+
+    # np.unique ordena por hash; se recorre en orden de primera aparición para que
+    # los empates de most_common() se resuelvan como en el recorrido con csv
+    orden = np.argsort(primeros)
+    for idx, conteo in zip(primeros[orden].tolist(), conteos[orden].tolist()):
+        c0, c1 = rango_c[idx]
+        s0, s1 = rango_s[idx]
+        pares[(_decodificar_campo(crudo[c0:c1], encoding),
+               _decodificar_campo(crudo[s0:s1], encoding))] += conteo
+
+    return separar_pares(pares)
+
+
+def agrupar_sin_comillas(
+    archivo_csv: str, encoding: str
+) -> Optional[Tuple[Counter, Dict[str, Counter], int]]:
+    """
+    Agrupa un CSV sin comillas partiendo directamente los bytes por saltos de
+    línea y comas, sin pasar por la máquina de estados del módulo csv.
+
+    Solo es válido si ningún campo va entre comillas (entonces no puede haber
+    comas ni saltos de línea dentro de un campo); se comprueba sobre el archivo
+    completo con una búsqueda en C sobre el mapeo en memoria.
+
+    Returns:
+        Los conteos como agrupar_estudios, o None si el archivo tiene comillas
+        o saltos de línea que requieren el módulo csv.
+    """
+    with open(archivo_csv, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return separar_pares(Counter())
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'"') != -1:
+                return None
+
+            n = len(mm)
+            fin = mm.find(b"\n")
+            if fin == -1:
+                fin = n
+            linea_encabezado = mm[:fin].rstrip(b"\r")
+            if b"\r" in linea_encabezado:
+                # Saltos '\r' sueltos (Mac clásico): el modo texto del csv los entiende
+                return None
+
+            encabezado = linea_encabezado.decode(encoding, errors="replace").split(",")
+            ci = indice_columna(encabezado, CATEGORY_FIELD)
+            si = indice_columna(encabezado, SUBCATEGORY_FIELD)
+            minimo = max(ci, si) + 1
+            obtener_par = itemgetter(ci, si)
 
-    for fila in filas:
-        categoria = normalizar_texto(fila.get(CATEGORY_FIELD), "Sin categoría")
-        subcategoria = normalizar_texto(fila.get(SUBCATEGORY_FIELD), "Sin subcategoría")
+            pares_crudos = Counter()
+            inicio = fin + 1
+            while inicio < n:
+                # Bloques de ~TAMANO_BUFFER bytes que terminan en un salto de línea
+                fin_bloque = min(inicio + TAMANO_BUFFER, n)
+                if fin_bloque < n:
+                    corte = mm.rfind(b"\n", inicio, fin_bloque)
+                    if corte == -1:
+                        corte = mm.find(b"\n", fin_bloque)
+                    fin_bloque = n if corte == -1 else corte
+                bloque = mm[inicio:fin_bloque]
+                inicio = fin_bloque + 1
 
-        categorias[categoria] += 1
-        subcategorias_por_categoria[categoria][subcategoria] += 1
+                partes = [linea.split(b",", minimo) for linea in bloque.split(b"\n")]
+                try:
+                    pares_crudos.update(Counter(map(obtener_par, partes)))
+                    continue
+                except IndexError:
+                    pass
 
-    return categorias, subcategorias_por_categoria
+                for campos in partes:
+                    if len(campos) < minimo:
+                        # Igual que csv.reader: se omiten líneas vacías y se completan filas cortas
+                        if campos == [b""] or campos == [b"\r"]:
+                            continue
+                        campos = campos + [b""] * (minimo - len(campos))
+                    pares_crudos[(campos[ci], campos[si])] += 1
+
+    # Solo se decodifica un representante por par distinto
+    pares = Counter()
+    for (categoria, subcategoria), count in pares_crudos.items():
+        pares[(categoria.decode(encoding, errors="replace"),
+               subcategoria.decode(encoding, errors="replace"))] += count
+
+    return separar_pares(pares)
+
+
+def particionar_csv(mm: mmap.mmap, partes: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Divide el CSV mapeado en rangos de bytes de tamaño similar que empiezan y
+    terminan en un límite de registro.
+
+    Un salto de línea separa registros solo si la cantidad de comillas previas
+    es par (si no, está dentro de un campo entre comillas); la paridad se lleva
+    de forma incremental, así que cada byte se inspecciona una sola vez.
+
+    Returns:
+        El offset donde termina el encabezado y la lista de rangos [inicio, fin).
+    """
+    n = len(mm)
+    pos = 0
+    comillas = 0
+
+    def siguiente_corte(desde: int) -> int:
+        nonlocal pos, comillas
+        corte = mm.find(b"\n", desde)
+        while corte != -1:
+            comillas += mm[pos:corte].count(b'"')
+            pos = corte
+            if comillas % 2 == 0:
+                return corte + 1
+            corte = mm.find(b"\n", corte + 1)
+        return n
+
+    fin_encabezado = siguiente_corte(0)
+    limites = [fin_encabezado]
+    for k in range(1, partes):
+        objetivo = fin_encabezado + (n - fin_encabezado) * k // partes
+        if objetivo < limites[-1]:
+            continue
+        corte = siguiente_corte(objetivo)
+        if corte >= n:
+            break
+        limites.append(corte)
+    limites.append(n)
+
+    return fin_encabezado, [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+
+
+def _contar_rango(
+    archivo_csv: str, inicio: int, fin: int, encoding: str, encabezado: List[str]
+) -> Counter:
+    """Cuenta los pares crudos de un rango de bytes del CSV (se ejecuta en un proceso aparte)."""
+    with open(archivo_csv, "rb") as f:
+        f.seek(inicio)
+        texto = f.read(fin - inicio).decode(encoding, errors="replace")
+    # newline=None unifica '\r\n' y '\r' igual que la lectura en modo texto
+    filas = csv.reader(io.StringIO(texto, newline=None))
+    return contar_pares(chain([encabezado], filas))
+
+
+def agrupar_en_paralelo(
+    archivo_csv: str, encoding: str, trabajadores: int
+) -> Optional[Tuple[Counter, Dict[str, Counter], int]]:
+    """
+    Reparte el conteo de un CSV grande entre varios procesos.
+
+    Cada proceso cuenta los pares de su rango de bytes y los resultados se
+    suman al final en el mismo orden del archivo.
+
+    Returns:
+        Un Counter por categoría, un dict {categoria: Counter(subcategorias)}
+        y el número de filas de datos contadas, o None si el archivo usa saltos
+        '\r' sueltos, que la partición por '\n' no separa.
+    """
+    with open(archivo_csv, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            fin_encabezado, rangos = particionar_csv(mm, trabajadores)
+            if b"\r" in mm[:fin_encabezado].rstrip(b"\r\n"):
+                # Saltos '\r' sueltos (Mac clásico): el modo texto del csv los entiende
+                return None
+            texto_encabezado = mm[:fin_encabezado].decode(encoding, errors="replace")
+
+    encabezado = next(csv.reader(io.StringIO(texto_encabezado, newline=None)), None)
+    if encabezado is None:
+        return separar_pares(Counter())
+    # Validar las columnas aquí para que el error se informe desde el proceso principal
+    indice_columna(encabezado, CATEGORY_FIELD)
+    indice_columna(encabezado, SUBCATEGORY_FIELD)
+
+    # Importación diferida: multiprocessing solo se carga para archivos grandes
+    from concurrent.futures import ProcessPoolExecutor
+
+    pares = Counter()
+    with ProcessPoolExecutor(max_workers=trabajadores) as executor:
+        futuros = [
+            executor.submit(_contar_rango, archivo_csv, inicio, fin, encoding, encabezado)
+            for inicio, fin in rangos
+        ]
+        for futuro in futuros:
+            pares.update(futuro.result())
+
+    return separar_pares(pares)
+
+
+def agrupar_archivo(archivo_csv: str) -> Tuple[Counter, Dict[str, Counter], int]:
+    """
+    Agrupa los estudios de un archivo eligiendo la implementación más rápida disponible.
+
+    Returns:
+        Un Counter por categoría, un dict {categoria: Counter(subcategorias)}
+        y el número de filas de datos contadas.
+    """
+    if not os.path.exists(archivo_csv):
+        print(f"Error: El archivo '{archivo_csv}' no existe.")
+        sys.exit(1)
+
+    encoding = detectar_encoding(archivo_csv)
+
+    if NUMBA_DISPONIBLE and os.path.getsize(archivo_csv) >= UMBRAL_NUMBA_BYTES:
+        with open(archivo_csv, "rb") as f:
+            resultado = agrupar_bytes(f.read(), encoding)
+        if resultado is not None:
+            return resultado
+
+    resultado = agrupar_sin_comillas(archivo_csv, encoding)
+    if resultado is not None:
+        return resultado
+
+    trabajadores = os.cpu_count() or 1
+    if trabajadores > 1 and os.path.getsize(archivo_csv) >= UMBRAL_PARALELO_BYTES:
+        resultado = agrupar_en_paralelo(archivo_csv, encoding, trabajadores)
+        if resultado is not None:
+            return resultado
+
+    return agrupar_estudios(iter_csv(archivo_csv))
+
+
+def _ruta_cache(archivo_csv: str) -> str:
+    """Ruta del archivo de caché asociado a un CSV (una por ruta absoluta)."""
+    digest = hashlib.sha1(os.path.abspath(archivo_csv).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"agrupacion_{digest}.pkl")
+
+
+def _firma_archivo(archivo_csv: str) -> Tuple[int, int, int]:
+    """Identifica la versión del CSV por fecha de modificación y tamaño."""
+    info = os.stat(archivo_csv)
+    return (CACHE_VERSION, info.st_mtime_ns, info.st_size)
+
+
+def cargar_cache(archivo_csv: str) -> Optional[Tuple[Counter, Dict[str, Counter], int]]:
+    """
+    Recupera los conteos guardados si el CSV no cambió desde que se calcularon.
+
+    Returns:
+        Los conteos (categorias, subcategorias_por_categoria, n_filas) o None
+        si no hay caché válida.
+    """
+    if not os.path.exists(archivo_csv):
+        return None
+
+    try:
+        with open(_ruta_cache(archivo_csv), "rb") as f:
+            firma, resultado = pickle.load(f)
+    except Exception:
+        return None
+
+    return resultado if firma == _firma_archivo(archivo_csv) else None
+
+
+def guardar_cache(archivo_csv: str, resultado: Tuple[Counter, Dict[str, Counter], int]) -> None:
+    """Guarda los conteos junto con la firma del CSV; los errores de escritura se ignoran."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_ruta_cache(archivo_csv), "wb") as f:
+            pickle.dump((_firma_archivo(archivo_csv), resultado), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
 
 
 def imprimir_resumen(
-    categorias: Counter, subcategorias_por_categoria: Dict[str, Counter]
+    categorias: Counter, subcategorias_por_categoria: Dict[str, Counter], total: int
 ) -> None:
     """Imprime los conteos agrupados."""
-    total = sum(categorias.values())
+    # Ordenar una sola vez y reutilizar el resultado en ambas secciones
+    categorias_ordenadas = categorias.most_common()
     print(f"\nTotal de estudios analizados: {total}\n")
 
     print("Conteo por categoría:")
-    for categoria, count in categorias.most_common():
+    for categoria, count in categorias_ordenadas:
         porcentaje = (count / total) * 100 if total else 0
         print(f"- {categoria}: {count} ({porcentaje:.1f}%)")
     print("")
 
     print("Detalle por categoría y subcategoría:")
-    for categoria, counter in categorias.most_common():
-        print(f"\n{categoria} ({categorias[categoria]} estudios)")
+    for categoria, total_cat in categorias_ordenadas:
+        print(f"\n{categoria} ({total_cat} estudios)")
         for subcategoria, count in subcategorias_por_categoria[categoria].most_common():
-            porcentaje = (count / categorias[categoria]) * 100 if categorias[categoria] else 0
+            porcentaje = (count / total_cat) * 100 if total_cat else 0
             print(f"  • {subcategoria}: {count} ({porcentaje:.1f}%)")
     print("")
 
 
-def crear_grafico_barras(categorias: Counter) -> None:
+def crear_grafico_barras(categorias: Counter, total: int) -> None:
     """Crea un gráfico de barras con los conteos por categoría."""
-    if not MATPLOTLIB_DISPONIBLE:
+    # Importación diferida: matplotlib solo se carga cuando realmente se dibuja
+    try:
+        import matplotlib
+        # Usar backend Agg que funciona en todos los entornos (guarda archivos)
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import numpy as np
+    except ImportError:
         print("\n⚠️  Matplotlib no está instalado. Para ver el gráfico, instálalo con:")
         print("   pip install matplotlib")
         return
@@ -111,7 +541,9 @@ def crear_grafico_barras(categorias: Counter) -> None:
     # Preparar datos
     categorias_ordenadas = categorias.most_common()
     nombres = [cat for cat, _ in categorias_ordenadas]
-    valores = [count for _, count in categorias_ordenadas]
+    valores = np.fromiter((count for _, count in categorias_ordenadas), dtype=np.int64,
+                          count=len(categorias_ordenadas))
+    porcentajes = valores / total * 100
     
     # Crear el gráfico
     plt.figure(figsize=(12, 6))
@@ -124,37 +556,59 @@ def crear_grafico_barras(categorias: Counter) -> None:
     plt.xticks(range(len(nombres)), nombres, rotation=45, ha='right')
     plt.grid(axis='y', alpha=0.3, linestyle='--')
     
-    # Agregar valores en las barras
-    for i, (barra, valor) in enumerate(zip(barras, valores)):
-        altura = barra.get_height()
-        porcentaje = (valor / sum(valores)) * 100
-        plt.text(barra.get_x() + barra.get_width()/2., altura,
-                f'{valor}\n({porcentaje:.1f}%)',
-                ha='center', va='bottom', fontsize=9, fontweight='bold')
+    # Agregar valores en las barras (una sola llamada para todas las etiquetas)
+    etiquetas = [f'{valor}\n({porcentaje:.1f}%)' for valor, porcentaje in zip(valores.tolist(), porcentajes.tolist())]
+    plt.bar_label(barras, labels=etiquetas, fontsize=9, fontweight='bold')
     
     # Ajustar layout para que no se corten las etiquetas
     plt.tight_layout()
     
     # Guardar el gráfico en un archivo
     nombre_archivo = "grafico_categorias.png"
-    plt.savefig(nombre_archivo, dpi=300, bbox_inches='tight')
+    # Sin bbox_inches='tight': tight_layout ya ajustó los márgenes y así la figura se renderiza una sola vez
+    plt.savefig(nombre_archivo, dpi=150)
     print(f"\n📊 Gráfico guardado como '{nombre_archivo}'")
-    print(f"   Puedes abrirlo para ver la visualización de las categorías.")
+    print("   Puedes abrirlo para ver la visualización de las categorías.")
     
     plt.close()  # Cerrar la figura para liberar memoria
 
 
+def obtener_conteos(archivo_csv: str) -> Tuple[Counter, Dict[str, Counter], int]:
+    """
+    Devuelve los conteos del CSV, desde la caché si el archivo no cambió.
+
+    Es la única lectura del archivo: el resumen, el gráfico y el conteo de filas
+    salen de este mismo resultado.
+    """
+    resultado = cargar_cache(archivo_csv)
+    if resultado is None:
+        resultado = agrupar_archivo(archivo_csv)
+        guardar_cache(archivo_csv, resultado)
+    return resultado
+
+
 def main() -> None:
-    filas = leer_csv(CSV_FILE)
-    if not filas:
+    parser = argparse.ArgumentParser(description="Agrupa y cuenta estudios por categoría y subcategoría.")
+    parser.add_argument(
+        "--count-only",
+        action="store_true",
+        help="solo muestra el número de filas de datos, sin resumen ni gráfico",
+    )
+    args = parser.parse_args()
+
+    categorias, subcategorias_por_categoria, n_filas = obtener_conteos(CSV_FILE)
+
+    if args.count_only:
+        print(f"El archivo '{CSV_FILE}' contiene {n_filas} filas de datos (más la línea de encabezado).")
+        return
+
+    if not categorias:
         print("El archivo no contiene datos.")
         return
 
-    categorias, subcategorias_por_categoria = agrupar_estudios(filas)
-    imprimir_resumen(categorias, subcategorias_por_categoria)
-    crear_grafico_barras(categorias)
+    imprimir_resumen(categorias, subcategorias_por_categoria, n_filas)
+    crear_grafico_barras(categorias, n_filas)
 
 
 if __name__ == "__main__":
     main()
-
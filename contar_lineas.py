@@ -1,61 +1,71 @@
 #!/usr/bin/env python3
 """
 Script para contar todas las líneas en un archivo CSV.
+
+Se cuentan los saltos de línea sobre los bytes, sin interpretar el CSV: funciona
+con cualquier CSV y el resultado depende solo del contenido del archivo.
 """
 
+import mmap
 import sys
 import os
 
+# Nombre del archivo CSV
+CSV_FILE = "data/este_TCIM_195_scored_final.csv"
+# Tamaño de cada bloque del archivo mapeado sobre el que se cuentan saltos de línea
+TAMANO_BLOQUE = 1 << 20
+
+
 def contar_lineas_csv(archivo_csv):
     """
     Cuenta todas las líneas en un archivo CSV.
-    Intenta diferentes codificaciones para manejar archivos con caracteres especiales.
-    
+    Mapea el archivo en memoria y cuenta los saltos de línea directamente sobre
+    los bytes, sin decodificar ni crear una cadena por línea. Los archivos con
+    saltos '\\r' sueltos (Mac clásico) se cuentan por '\\r'.
+
     Args:
         archivo_csv: Ruta al archivo CSV
-        
+
     Returns:
         Número total de líneas en el archivo
     """
-    # Lista de codificaciones a intentar (en orden de preferencia)
-    codificaciones = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'utf-8-sig']
-    
-    for encoding in codificaciones:
-        try:
-            with open(archivo_csv, 'r', encoding=encoding, errors='replace') as f:
-                line_count = sum(1 for line in f)
-            return line_count
-        except UnicodeDecodeError:
-            continue
-        except FileNotFoundError:
-            print(f"Error: No se encontró el archivo '{archivo_csv}'")
-            sys.exit(1)
-        except Exception as e:
-            # Si es otro tipo de error, intentamos con la siguiente codificación
-            continue
-    
-    # Si ninguna codificación funcionó, intentamos en modo binario
     try:
         with open(archivo_csv, 'rb') as f:
-            line_count = sum(1 for line in f)
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                line_count = 0
+                for inicio in range(0, len(mm), TAMANO_BLOQUE):
+                    line_count += mm[inicio:inicio + TAMANO_BLOQUE].count(b'\n')
+                salto = b'\n'
+                if line_count == 0 and mm.find(b'\r') != -1:
+                    salto = b'\r'
+                    for inicio in range(0, len(mm), TAMANO_BLOQUE):
+                        line_count += mm[inicio:inicio + TAMANO_BLOQUE].count(b'\r')
+                # La última línea cuenta aunque no termine en salto de línea
+                if mm[-1:] != salto:
+                    line_count += 1
         return line_count
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo '{archivo_csv}'")
+        sys.exit(1)
     except Exception as e:
         print(f"Error al leer el archivo: {e}")
         sys.exit(1)
 
+
 if __name__ == "__main__":
     # Nombre del archivo CSV
-    archivo = "data/este_TCIM_195_scored_final.csv"
-    
+    archivo = CSV_FILE
+
     # Verificar que el archivo existe
     if not os.path.exists(archivo):
         print(f"Error: El archivo '{archivo}' no existe en el directorio actual.")
         sys.exit(1)
-    
+
     # Contar las líneas
     total_lineas = contar_lineas_csv(archivo)
-    
+
     # Mostrar el resultado
     print(f"El archivo '{archivo}' contiene {total_lineas} líneas en total.")
     print(f"(Incluyendo la línea de encabezado: {total_lineas - 1} filas de datos)")
-
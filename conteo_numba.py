@@ -0,0 +1,20 @@
+"""
+Conteo (categoría, nivel) compilado con Numba, para archivos grandes.
+
+Vive en un módulo aparte para que grafico_interactivo_html.py solo importe
+Numba (y cargue el código compilado) cuando de verdad cuenta muchas filas.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def contar_matriz_paralelo(filas, columnas, n_filas, n_columnas, hilos):
+    """Igual que contar_matriz, con una matriz parcial por hilo que se suman al final."""
+    parciales = np.zeros((hilos, n_filas, n_columnas), dtype=np.int64)
+    tramo = (len(filas) + hilos - 1) // hilos
+    for h in prange(hilos):
+        for k in range(h * tramo, min(len(filas), (h + 1) * tramo)):
+            parciales[h, filas[k], columnas[k]] += 1
+    return parciales.sum(axis=0)
@@ -0,0 +1,80 @@
+"""
+Recorrido por bytes del CSV compilado con Numba, para archivos grandes.
+
+Vive en un módulo aparte para que agrupar_estudios.py solo importe NumPy y
+Numba (y cargue el código compilado) cuando de verdad recorre un archivo grande.
+"""
+
+import numpy as np
+from numba import njit
+
+FNV_OFFSET = np.uint64(14695981039346656037)
+FNV_PRIME = np.uint64(1099511628211)
+
+
+@njit(cache=True)
+def escanear_columnas(datos, inicio, ci, si):
+    """
+    Recorre el CSV byte a byte (respetando comillas) y devuelve, por fila,
+    el hash FNV-1a de los campos en las posiciones ci y si junto con sus
+    rangos [inicio, fin) dentro del buffer.
+    """
+    n = datos.shape[0]
+    max_filas = 1
+    for i in range(inicio, n):
+        if datos[i] == 10:
+            max_filas += 1
+
+    hash_c = np.empty(max_filas, np.uint64)
+    hash_s = np.empty(max_filas, np.uint64)
+    rango_c = np.zeros((max_filas, 2), np.int64)
+    rango_s = np.zeros((max_filas, 2), np.int64)
+
+    fila = 0
+    campo = 0
+    en_comillas = False
+    ini_fila = inicio
+    ini_campo = inicio
+    h = FNV_OFFSET
+    hash_c[0] = FNV_OFFSET
+    hash_s[0] = FNV_OFFSET
+
+    for i in range(inicio, n + 1):
+        b = datos[i] if i < n else 10
+        if en_comillas and i < n:
+            if b == 34:
+                en_comillas = False
+        elif b == 34:
+            en_comillas = True
+        elif b == 44 or b == 10:
+            # Cierre de campo
+            if campo == ci:
+                hash_c[fila] = h
+                rango_c[fila, 0] = ini_campo
+                rango_c[fila, 1] = i
+            elif campo == si:
+                hash_s[fila] = h
+                rango_s[fila, 0] = ini_campo
+                rango_s[fila, 1] = i
+            campo += 1
+            ini_campo = i + 1
+            h = FNV_OFFSET
+            if b == 10:
+                # Cierre de fila; las líneas vacías no cuentan (como csv.reader)
+                vacia = i == ini_fila or (i == ini_fila + 1 and datos[ini_fila] == 13)
+                if not vacia:
+                    fila += 1
+                    if fila < max_filas:
+                        hash_c[fila] = FNV_OFFSET
+                        hash_s[fila] = FNV_OFFSET
+                        rango_c[fila, 0] = 0
+                        rango_c[fila, 1] = 0
+                        rango_s[fila, 0] = 0
+                        rango_s[fila, 1] = 0
+                campo = 0
+                ini_fila = i + 1
+            continue
+        if campo == ci or campo == si:
+            h = (h ^ np.uint64(b)) * FNV_PRIME
+
+    return hash_c[:fila], hash_s[:fila], rango_c[:fila], rango_s[:fila]
@@ -4,104 +4,536 @@ Script para generar un gráfico de barras interactivo en HTML.
 Permite hacer clic en las barras para ver detalles de las subcategorías.
 """
 
+import argparse
 import csv
+import gzip
+import hashlib
+import html
+import importlib.util
 import os
 import sys
 import json
 from collections import Counter, defaultdict
-from typing import Dict, List, Tuple
+from contextlib import contextmanager
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 
-try:
-    import plotly.graph_objects as go
-    import plotly.offline as pyo
-    PLOTLY_DISPONIBLE = True
-except ImportError:
-    PLOTLY_DISPONIBLE = False
+# La codificación se detecta igual que en agrupar_estudios.py, para que ambos
+# scripts lean el mismo CSV con las mismas letras
+from agrupar_estudios import detectar_encoding
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+# pandas y pyarrow solo se importan si el archivo supera UMBRAL_PANDAS_BYTES;
+# aquí basta con saber si están instalados
+PANDAS_DISPONIBLE = importlib.util.find_spec("pandas") is not None
+PYARROW_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+
+# orjson se importa al serializar; aquí basta con saber si está instalado
+ORJSON_DISPONIBLE = importlib.util.find_spec("orjson") is not None
+
+# Numba solo se importa si hay que contar al menos UMBRAL_NUMBA_FILAS filas
+NUMBA_DISPONIBLE = importlib.util.find_spec("numba") is not None
 
 
 CSV_FILE = "data/este_TCIM_195_scored_final.csv"
 CATEGORY_FIELD = "Category"
 SUBCATEGORY_FIELD = "Subcategory"
 SUITABILITY_FIELD = "TCIM_suitability_level"
-ENCODINGS = ["utf-8", "latin-1", "iso-8859-1", "cp1252", "utf-8-sig"]
+TITLE_FIELD = "Title"
+AUTHOR_FIELD = "Author"
+YEAR_FIELD = "Year"
+# Filas que se procesan por bloque; acota la memoria de trabajo durante la agrupación
+TAMANO_BLOQUE_FILAS = 65536
+# A partir de este tamaño compensa importar pandas (y pyarrow) para leer y agrupar;
+# por debajo el módulo csv termina antes de que pandas acabe de importarse
+UMBRAL_PANDAS_BYTES = 16 * 1024 * 1024
+# A partir de estas filas compensa compilar con Numba el conteo (categoría, nivel)
+UMBRAL_NUMBA_FILAS = 10_000_000
+HTML_FILE = "docs/grafico_interactivo.html"
+# Huella del CSV con el que se generó HTML_FILE; si no cambió, no se regenera
+HASH_FILE = "docs/.grafico_hash"
+# Carpeta donde se guarda, en formato Feather, la tabla leída por pyarrow
+CACHE_DIR = ".cache"
+# Cambiar si cambia la forma de leer la tabla, para no reutilizar cachés antiguas
+CACHE_VERSION = 2
+# A partir de estas categorías las barras se dibujan sin borde, que con muchas
+# barras es lo que más cuesta trazar en SVG
+UMBRAL_BARRAS_SIN_BORDE = 30
+# Estudios por categoría que van dentro del HTML; el resto se escribe en
+# DIR_ESTUDIOS y el navegador lo descarga al abrir la tabla de esa categoría
+LIMITE_ESTUDIOS_INLINE = 100
+DIR_ESTUDIOS = "docs/estudios"
+# id fijo del div del gráfico, para que el JS lo encuentre sin recorrer el DOM
+ID_GRAFICO = "main-chart"
 
 
-def leer_csv(archivo_csv: str) -> List[Dict[str, str]]:
+@contextmanager
+def leer_csv(archivo_csv: str) -> Iterator[Iterator[List[str]]]:
     """
-    Lee el archivo CSV intentando múltiples codificaciones.
+    Lee el archivo CSV con la codificación detectada, abriéndolo una sola vez.
 
-    Returns:
-        Lista de filas como diccionarios.
+    Se usa como `with leer_csv(ruta) as filas:`. El archivo se decodifica a
+    medida que se recorren las filas, sin copiarlo entero en memoria.
+
+    Yields:
+        Iterador de filas como listas; la primera es el encabezado.
     """
     if not os.path.exists(archivo_csv):
         print(f"Error: El archivo '{archivo_csv}' no existe.")
         sys.exit(1)
 
-    for encoding in ENCODINGS:
-        try:
-            with open(archivo_csv, "r", encoding=encoding, errors="replace") as f:
-                reader = csv.DictReader(f)
-                return list(reader)
-        except UnicodeDecodeError:
-            continue
-        except Exception:
-            continue
+    try:
+        encoding = detectar_encoding(archivo_csv)
+        # Sin newline='': los saltos de línea se traducen como en modo texto
+        archivo = open(archivo_csv, "r", encoding=encoding, errors="replace")
+    except OSError as e:
+        print(f"Error al leer el archivo: {e}")
+        sys.exit(1)
+    with archivo:
+        yield csv.reader(archivo)
+
 
-    print("Error: No se pudo leer el archivo con las codificaciones probadas.")
-    sys.exit(1)
+def agrupar_estudios(filas: Iterable[List[str]]) -> Tuple[Counter, Dict[str, Counter], List[Tuple[str, ...]], Dict[str, Counter]]:
+    """
+    Agrupa y cuenta los estudios por categoría, subcategoría y nivel de aplicabilidad TCIM.
 
+    Recorre las filas una sola vez. La primera fila debe ser el encabezado (como
+    la entrega leer_csv); las columnas se resuelven una sola vez y luego se
+    accede por posición. De cada estudio se guardan solo los campos que muestra
+    la tabla del HTML, no la fila completa.
 
-def normalizar_texto(valor: str, texto_vacio: str = "Sin dato") -> str:
-    """Normaliza textos eliminando espacios y valores vacíos."""
-    if valor is None:
-        return texto_vacio
-    limpio = valor.strip()
-    return limpio if limpio else texto_vacio
+    Returns:
+        Un Counter por categoría, un dict {categoria: Counter(subcategorias)},
+        la lista de estudios en orden del archivo como tuplas (categoría,
+        título, autor, año, subcategoría, aplicabilidad), y un dict
+        {categoria: Counter(suitability_levels)}.
+    """
+    # Durante el recorrido se cuenta con defaultdict(int): a diferencia de
+    # Counter, una clave nueva no pasa por un __missing__ escrito en Python
+    categorias: Dict[str, int] = defaultdict(int)
+    subcategorias_por_categoria: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    estudios: List[Tuple[str, ...]] = []
+    suitability_por_categoria: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
 
+    filas = iter(filas)
+    encabezado = next(filas, None)
+    if encabezado is None:
+        return Counter(), defaultdict(Counter), estudios, defaultdict(Counter)
 
-def agrupar_estudios(filas: List[Dict[str, str]]) -> Tuple[Counter, Dict[str, Counter], Dict[str, List[Dict]], Dict[str, Counter]]:
+    # Índice de cada columna; las que faltan apuntan justo después del encabezado,
+    # donde el relleno de abajo deja un texto vacío (como el None de DictReader)
+    idx = {nombre: i for i, nombre in enumerate(encabezado)}
+    ancho = len(encabezado)
+    columnas = (CATEGORY_FIELD, SUBCATEGORY_FIELD, SUITABILITY_FIELD, TITLE_FIELD, AUTHOR_FIELD, YEAR_FIELD)
+    cat_i, sub_i, suit_i, title_i, author_i, year_i = (idx.get(nombre, ancho) for nombre in columnas)
+    if any(nombre not in idx for nombre in columnas):
+        # Se recortan los campos sobrantes para no leer uno de ellos como columna faltante
+        filas = (fila[:ancho] for fila in filas)
+    minimo = max(cat_i, sub_i, suit_i, title_i, author_i, year_i) + 1
+    relleno = [""] * minimo
+    # Función local: evita buscar el método strip en cada celda
+    _strip = str.strip
+
+    # Se procesa por bloques: cada columna se limpia de una vez con una comprensión
+    # de listas en lugar de normalizar cada campo por separado en cada fila
+    while True:
+        bloque = list(islice(filas, TAMANO_BLOQUE_FILAS))
+        if not bloque:
+            break
+
+        # Igual que DictReader: se omiten líneas vacías y se completan filas cortas
+        bloque = [fila if len(fila) >= minimo else (fila + relleno)[:minimo] for fila in bloque if fila]
+
+        cats = [_strip(fila[cat_i]) or "Sin categoría" for fila in bloque]
+        subs = [_strip(fila[sub_i]) for fila in bloque]
+        suits = [_strip(fila[suit_i]) for fila in bloque]
+        titulos = [_strip(fila[title_i]) or "[Sin título]" for fila in bloque]
+        autores = [_strip(fila[author_i]) or "[Sin autor]" for fila in bloque]
+        anios = [_strip(fila[year_i]) or "[Sin año]" for fila in bloque]
+
+        # Las tuplas de la tabla se arman en C con zip; el bucle solo cuenta
+        estudios.extend(zip(
+            cats, titulos, autores, anios,
+            [subcategoria or '[Sin subcategoría]' for subcategoria in subs],
+            [suitability or 'N/A' for suitability in suits],
+        ))
+        for categoria, subcategoria, suitability in zip(cats, subs, suits):
+            categorias[categoria] += 1
+            subcategorias_por_categoria[categoria][subcategoria or "Sin subcategoría"] += 1
+            suitability_por_categoria[categoria][suitability or "Not applicable"] += 1
+
+    # Counter solo al final, para el most_common() que usa el gráfico
+    return (
+        Counter(categorias),
+        defaultdict(Counter, {cat: Counter(subs) for cat, subs in subcategorias_por_categoria.items()}),
+        estudios,
+        defaultdict(Counter, {cat: Counter(niveles) for cat, niveles in suitability_por_categoria.items()}),
+    )
+
+
+def contar_matriz(filas: "np.ndarray", columnas: "np.ndarray", n_filas: int, n_columnas: int) -> "np.ndarray":
     """
-    Agrupa y cuenta los estudios por categoría, subcategoría y nivel de aplicabilidad TCIM.
+    Cuenta las apariciones de cada par de códigos (fila, columna) en una matriz densa.
+
+    Con archivos grandes y Numba instalado el recorrido se reparte entre hilos;
+    si no, se usa np.add.at.
+    """
+    import numpy as np
+
+    if NUMBA_DISPONIBLE and len(filas) >= UMBRAL_NUMBA_FILAS:
+        from numba import get_num_threads
+        from conteo_numba import contar_matriz_paralelo
+        return contar_matriz_paralelo(filas, columnas, n_filas, n_columnas, get_num_threads())
+    matriz = np.zeros((n_filas, n_columnas), dtype=np.int64)
+    np.add.at(matriz, (filas, columnas), 1)
+    return matriz
+
+
+def _ruta_cache_tabla(archivo_csv: str) -> str:
+    """Ruta de la tabla Feather asociada a un CSV (una por ruta absoluta)."""
+    digest = hashlib.sha1(os.path.abspath(archivo_csv).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"tabla_{digest}.feather")
+
+
+def _firma_tabla(archivo_csv: str, columnas: Tuple[str, ...]) -> bytes:
+    """Identifica la versión del CSV (fecha de modificación y tamaño) y las columnas leídas."""
+    info = os.stat(archivo_csv)
+    return "\t".join([str(CACHE_VERSION), str(info.st_mtime_ns), str(info.st_size), *columnas]).encode("utf-8")
+
+
+def cargar_tabla_cache(archivo_csv: str, columnas: Tuple[str, ...]) -> Optional["pa.Table"]:
+    """
+    Recupera la tabla guardada si el CSV no cambió desde que se leyó.
 
     Returns:
-        Un Counter por categoría, un dict {categoria: Counter(subcategorias)},
-        un dict con los estudios completos por categoría,
-        y un dict {categoria: Counter(suitability_levels)}.
+        La tabla de pyarrow, o None si no hay caché válida.
+    """
+    import pyarrow.feather as pa_feather
+
+    try:
+        tabla = pa_feather.read_table(_ruta_cache_tabla(archivo_csv))
+    except Exception:
+        return None
+    firma = (tabla.schema.metadata or {}).get(b"firma")
+    return tabla if firma == _firma_tabla(archivo_csv, columnas) else None
+
+
+def guardar_tabla_cache(archivo_csv: str, columnas: Tuple[str, ...], tabla: "pa.Table") -> None:
+    """Guarda la tabla con la firma del CSV en sus metadatos; los errores de escritura se ignoran."""
+    import pyarrow as pa
+    import pyarrow.feather as pa_feather
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tabla = tabla.replace_schema_metadata({b"firma": _firma_tabla(archivo_csv, columnas)})
+        pa_feather.write_feather(tabla, _ruta_cache_tabla(archivo_csv), compression="zstd")
+    except (OSError, pa.ArrowException):
+        pass
+
+
+def leer_con_pyarrow(archivo_csv: str, columnas: Tuple[str, ...], encoding: str) -> Optional["pd.DataFrame"]:
     """
-    categorias = Counter()
+    Lee solo las columnas indicadas con el lector CSV columnar de pyarrow.
+
+    pyarrow transcodifica desde la codificación detectada, como leer_csv y
+    pandas; si el archivo tiene bytes inválidos en ella devuelve None, y pandas
+    los reemplaza como hace leer_csv. La tabla se guarda
+    en CACHE_DIR y, mientras el CSV no cambie, las ejecuciones siguientes la
+    cargan desde ahí sin volver a interpretar el texto.
+
+    Returns:
+        Un DataFrame con las columnas pedidas (las ausentes quedan vacías), o
+        None si pyarrow no puede interpretar el archivo.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    tabla = cargar_tabla_cache(archivo_csv, columnas)
+    if tabla is not None:
+        return tabla.to_pandas()
+
+    try:
+        tabla = pa_csv.read_csv(
+            archivo_csv,
+            read_options=pa_csv.ReadOptions(encoding=encoding),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=list(columnas),
+                include_missing_columns=True,
+                column_types={columna: pa.string() for columna in columnas},
+                strings_can_be_null=False,
+            ),
+        )
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return None
+    guardar_tabla_cache(archivo_csv, columnas, tabla)
+    return tabla.to_pandas()
+
+
+def agrupar_con_pandas(archivo_csv: str) -> Optional[Tuple[Counter, Dict[str, Counter], List[Tuple[str, ...]], Dict[str, Counter]]]:
+    """
+    Igual que agrupar_estudios, pero con pandas: lectura en C y conteos con
+    groupby().size() en lugar de un bucle de Python por fila.
+
+    Los grupos se recorren en orden de aparición (sort=False), de modo que los
+    empates de most_common() se resuelven igual que en agrupar_estudios.
+
+    Returns:
+        Los mismos cuatro resultados que agrupar_estudios, o None si pandas no
+        puede leer el archivo (por ejemplo, filas con más campos que el
+        encabezado) y hay que usar el módulo csv.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columnas = (CATEGORY_FIELD, SUBCATEGORY_FIELD, SUITABILITY_FIELD, TITLE_FIELD, AUTHOR_FIELD, YEAR_FIELD)
+    encoding = detectar_encoding(archivo_csv)
+    df = leer_con_pyarrow(archivo_csv, columnas, encoding) if PYARROW_DISPONIBLE else None
+    if df is None:
+        try:
+            df = pd.read_csv(
+                archivo_csv,
+                encoding=encoding,
+                encoding_errors="replace",
+                usecols=lambda nombre: nombre in columnas,
+                dtype=str,
+                keep_default_na=False,
+                index_col=False,
+            )
+        except pd.errors.EmptyDataError:
+            df = pd.DataFrame(columns=list(columnas))
+        except (pd.errors.ParserError, ValueError):
+            return None
+
+    # Las columnas ausentes o los campos faltantes quedan como texto vacío
+    df = df.reindex(columns=list(columnas)).fillna("").astype(str)
+
+    # Cada columna se limpia una sola vez, aunque subcategoría y aplicabilidad
+    # tengan un texto por defecto distinto en los conteos y en la tabla. Los
+    # lectores de pandas y pyarrow conservan los "\r\n" de los campos entre
+    # comillas; el módulo csv los deja en "\n", así que se normalizan igual
+    limpias = {columna: df[columna].str.replace(r"\r\n?", "\n", regex=True).str.strip() for columna in columnas}
+
+    def normalizar(columna: str, texto_vacio: str) -> "pd.Series":
+        return limpias[columna].replace("", texto_vacio)
+
+    claves = pd.DataFrame({
+        "categoria": normalizar(CATEGORY_FIELD, "Sin categoría"),
+        "subcategoria": normalizar(SUBCATEGORY_FIELD, "Sin subcategoría"),
+        "suitability": normalizar(SUITABILITY_FIELD, "Not applicable"),
+    })
+    tabla = pd.DataFrame({
+        "categoria": claves["categoria"],
+        "title": normalizar(TITLE_FIELD, "[Sin título]"),
+        "author": normalizar(AUTHOR_FIELD, "[Sin autor]"),
+        "year": normalizar(YEAR_FIELD, "[Sin año]"),
+        "subcategory": normalizar(SUBCATEGORY_FIELD, "[Sin subcategoría]"),
+        "suitability": normalizar(SUITABILITY_FIELD, "N/A"),
+    })
+
+    # Cada texto pasa a un código entero; factorize numera en orden de aparición
+    cat_codes, cat_nombres = pd.factorize(claves["categoria"])
+    sub_codes, sub_nombres = pd.factorize(claves["subcategoria"])
+    lvl_codes, lvl_nombres = pd.factorize(claves["suitability"])
+    cat_nombres, sub_nombres, lvl_nombres = cat_nombres.tolist(), sub_nombres.tolist(), lvl_nombres.tolist()
+
+    categorias = Counter(dict(zip(cat_nombres, np.bincount(cat_codes, minlength=len(cat_nombres)).tolist())))
+
+    # Los pares (categoría, subcategoría) se codifican en un solo entero para
+    # conservar el orden de aparición de cada par, que decide los empates de most_common()
+    par_codes, pares = pd.factorize(cat_codes.astype(np.int64) * max(len(sub_nombres), 1) + sub_codes)
     subcategorias_por_categoria: Dict[str, Counter] = defaultdict(Counter)
-    estudios_por_categoria: Dict[str, List[Dict]] = defaultdict(list)
+    for par, count in zip(pares.tolist(), np.bincount(par_codes, minlength=len(pares)).tolist()):
+        categoria, subcategoria = divmod(par, len(sub_nombres))
+        subcategorias_por_categoria[cat_nombres[categoria]][sub_nombres[subcategoria]] = count
+
+    # Matriz (categoría, nivel) con los conteos de aplicabilidad
+    matriz = contar_matriz(cat_codes, lvl_codes, len(cat_nombres), len(lvl_nombres))
     suitability_por_categoria: Dict[str, Counter] = defaultdict(Counter)
+    for i, j in zip(*np.nonzero(matriz)):
+        suitability_por_categoria[cat_nombres[i]][lvl_nombres[j]] = int(matriz[i, j])
+
+    estudios = list(tabla.itertuples(index=False, name=None))
+
+    return categorias, subcategorias_por_categoria, estudios, suitability_por_categoria
+
+
+def agrupar_archivo(archivo_csv: str) -> Tuple[Counter, Dict[str, Counter], List[Tuple[str, ...]], Dict[str, Counter]]:
+    """
+    Agrupa los estudios de un archivo con pandas si está instalado y el archivo
+    llega a UMBRAL_PANDAS_BYTES; si no, recorriendo las filas con el módulo csv.
+
+    Returns:
+        Los mismos cuatro resultados que agrupar_estudios.
+    """
+    if not os.path.exists(archivo_csv):
+        print(f"Error: El archivo '{archivo_csv}' no existe.")
+        sys.exit(1)
+
+    if PANDAS_DISPONIBLE and os.path.getsize(archivo_csv) >= UMBRAL_PANDAS_BYTES:
+        resultado = agrupar_con_pandas(archivo_csv)
+        if resultado is not None:
+            return resultado
+
+    with leer_csv(archivo_csv) as filas:
+        return agrupar_estudios(filas)
 
-    for fila in filas:
-        categoria = normalizar_texto(fila.get(CATEGORY_FIELD), "Sin categoría")
-        subcategoria = normalizar_texto(fila.get(SUBCATEGORY_FIELD), "Sin subcategoría")
-        suitability = normalizar_texto(fila.get(SUITABILITY_FIELD), "Not applicable")
 
-        categorias[categoria] += 1
-        subcategorias_por_categoria[categoria][subcategoria] += 1
-        estudios_por_categoria[categoria].append(fila)
-        suitability_por_categoria[categoria][suitability] += 1
+def a_json(datos: object) -> str:
+    """Serializa a JSON compacto (sin sangría ni espacios), con orjson si está instalado."""
+    if ORJSON_DISPONIBLE:
+        import orjson
+        return orjson.dumps(datos).decode("utf-8")
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
 
-    return categorias, subcategorias_por_categoria, estudios_por_categoria, suitability_por_categoria
+
+# Escapes del bloque TSV embebido: tabuladores y saltos de línea separan campos
+# y filas, y '<' se sustituye para que un texto nunca pueda cerrar el <script>
+ESCAPES_TSV = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "<": "\\l"})
+# Columnas del TSV con pocos valores distintos (categoría, año, subcategoría,
+# aplicabilidad y etiqueta): cada fila lleva el índice del texto en una tabla común
+COLUMNAS_INTERNADAS = (0, 3, 4, 5, 6)
+
+
+def clase_badge(suitability: str) -> str:
+    """Clase CSS de la etiqueta de aplicabilidad (mismo criterio que tenía la tabla en JS)."""
+    nivel = suitability.lower()
+    if 'high' in nivel:
+        return 'badge-high'
+    if 'moderate' in nivel:
+        return 'badge-moderate'
+    if 'low' in nivel:
+        return 'badge-low'
+    return 'badge-na'
+
+
+def estudios_a_tsv(estudios: Iterable[Tuple[str, ...]]) -> str:
+    """
+    Serializa los estudios como TSV (una fila por estudio) para embeberlos en el HTML.
+
+    A cada estudio se le añade como última columna la clase de su etiqueta de
+    aplicabilidad, para que el navegador no la recalcule en cada renderizado.
+    La primera línea es la tabla de textos de COLUMNAS_INTERNADAS, en orden de
+    aparición; en las filas esas columnas llevan el índice en la tabla.
+    """
+    badges: Dict[str, str] = {}
+    textos: Dict[str, str] = {}
+    lineas = [""]
+    for estudio in estudios:
+        suitability = estudio[-1]
+        badge = badges.get(suitability)
+        if badge is None:
+            badge = badges[suitability] = clase_badge(suitability)
+        campos = [campo.translate(ESCAPES_TSV) for campo in estudio]
+        campos.append(badge)
+        for i in COLUMNAS_INTERNADAS:
+            indice = textos.get(campos[i])
+            if indice is None:
+                indice = textos[campos[i]] = str(len(textos))
+            campos[i] = indice
+        lineas.append("\t".join(campos))
+    lineas[0] = "\t".join(textos)
+    return "\n".join(lineas)
+
+
+def repartir_estudios(estudios: Iterable[Tuple[str, ...]], limite: int) -> Tuple[List[Tuple[str, ...]], Dict[str, List[Tuple[str, ...]]]]:
+    """
+    Separa los primeros `limite` estudios de cada categoría (en orden del archivo)
+    del resto.
+
+    Returns:
+        La lista de estudios que se embeben en el HTML y un dict
+        {categoria: estudios restantes} solo con las categorías que superan el límite.
+    """
+    vistos: Dict[str, int] = defaultdict(int)
+    inline: List[Tuple[str, ...]] = []
+    restantes: Dict[str, List[Tuple[str, ...]]] = defaultdict(list)
+    for estudio in estudios:
+        categoria = estudio[0]
+        if vistos[categoria] < limite:
+            vistos[categoria] += 1
+            inline.append(estudio)
+        else:
+            restantes[categoria].append(estudio)
+    return inline, dict(restantes)
+
+
+def copiar_plotly_local() -> str:
+    """
+    Escribe junto al HTML el plotly.min.js que trae la librería instalada, para
+    no depender del CDN al abrir la página. El nombre lleva la versión, así que
+    solo se escribe la primera vez (o al actualizar Plotly); al escribirla se
+    eliminan las copias de otras versiones.
+
+    Returns:
+        El valor de include_plotlyjs para pio.to_html: la ruta relativa del
+        archivo o 'cdn' si no se pudo escribir.
+    """
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    nombre = f"plotly-{get_plotlyjs_version()}.min.js"
+    ruta = os.path.join(os.path.dirname(HTML_FILE), nombre)
+    if os.path.exists(ruta):
+        return nombre
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        codigo = get_plotlyjs()
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(codigo)
+        with gzip.open(ruta + '.gz', 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(codigo)
+    except OSError as e:
+        print(f"⚠️  Could not write '{ruta}' ({e}); using the Plotly CDN instead.")
+        return 'cdn'
+
+    # Copias de versiones anteriores, que el HTML nuevo ya no referencia
+    carpeta = os.path.dirname(ruta)
+    for archivo in os.listdir(carpeta):
+        if (archivo.startswith('plotly-') and archivo.endswith(('.min.js', '.min.js.gz'))
+                and archivo not in (nombre, nombre + '.gz')):
+            try:
+                os.remove(os.path.join(carpeta, archivo))
+            except OSError:
+                pass
+    return nombre
 
 
 def crear_grafico_html_interactivo(
     categorias: Counter,
     subcategorias_por_categoria: Dict[str, Counter],
-    estudios_por_categoria: Dict[str, List[Dict]],
+    estudios: List[Tuple[str, ...]],
     suitability_por_categoria: Dict[str, Counter]
-) -> None:
-    """Crea un gráfico de barras interactivo en HTML con Plotly."""
-    if not PLOTLY_DISPONIBLE:
+) -> bool:
+    """
+    Crea un gráfico de barras interactivo en HTML con Plotly.
+
+    Returns:
+        True si se escribió el HTML; False si falta alguna dependencia.
+    """
+    # Importación diferida: Plotly y NumPy solo se cargan cuando realmente se genera el HTML
+    try:
+        import plotly.graph_objects as go
+        import plotly.io as pio
+    except ImportError:
         print("\n⚠️  Plotly is not installed. To generate the chart, install it with:")
         print("   pip install plotly")
-        return
+        return False
+    try:
+        import numpy as np
+    except ImportError:
+        print("\n⚠️  NumPy is not installed. To generate the chart, install it with:")
+        print("   pip install numpy")
+        return False
 
     # Preparar datos para barras apiladas
-    categorias_ordenadas = categorias.most_common()
-    nombres = [cat for cat, _ in categorias_ordenadas]
-    total = sum([count for _, count in categorias_ordenadas])
+    # Una sola pasada sobre most_common() separa nombres y conteos
+    nombres, conteos = zip(*categorias.most_common()) if categorias else ((), ())
+    nombres = list(nombres)
+    total = sum(conteos)
     
     # Definir niveles de aplicabilidad y sus colores
     suitability_levels = ['High', 'Moderate', 'Low', 'Not applicable']
@@ -112,29 +544,34 @@ def crear_grafico_html_interactivo(
         'Not applicable': '#95a5a6'  # Gris
     }
     
-    # Preparar datos apilados para cada nivel de aplicabilidad
-    stacked_data = {}
-    for level in suitability_levels:
-        stacked_data[level] = []
-        for categoria in nombres:
-            count = suitability_por_categoria[categoria].get(level, 0)
-            stacked_data[level].append(count)
+    # Preparar datos apilados: matriz (categoría, nivel) de la que cada traza toma una columna
+    stacked_data = np.zeros((len(nombres), len(suitability_levels)), dtype=np.int32)
+    for i, categoria in enumerate(nombres):
+        niveles = suitability_por_categoria[categoria]
+        for j, level in enumerate(suitability_levels):
+            stacked_data[i, j] = niveles.get(level, 0)
     
-    # Crear el gráfico de barras apiladas
+    # Crear el gráfico de barras apiladas; las propiedades son fijas y conocidas,
+    # así que la figura no revalida cada una contra el esquema en add_trace/update_layout
     fig = go.Figure()
+    fig._validate = False
+    ancho_borde = 0 if len(nombres) > UMBRAL_BARRAS_SIN_BORDE else 1
+    # Cada barra lleva la posición de su categoría, que el JS usa como índice de datosSubcategorias
+    indices_categorias = np.arange(len(nombres), dtype=np.int32)
     
     # Agregar una barra para cada nivel de aplicabilidad
-    for level in suitability_levels:
+    for j, level in enumerate(suitability_levels):
         fig.add_trace(go.Bar(
             name=level,
             x=nombres,
-            y=stacked_data[level],
+            y=stacked_data[:, j],
+            customdata=indices_categorias,
             marker=dict(
                 color=suitability_colors[level],
-                line=dict(color='#2c3e50', width=1),
+                line=dict(color='#2c3e50', width=ancho_borde),
                 opacity=0.85
             ),
-            text=[f"<b>{count}</b>" if count > 0 else "" for count in stacked_data[level]],
+            text=[f"<b>{count}</b>" if count > 0 else "" for count in stacked_data[:, j].tolist()],
             textposition='inside',
             textfont=dict(size=11, color='white', family='Segoe UI, Tahoma, Geneva, Verdana, sans-serif'),
             hovertemplate=f"<b>{level}</b><br>" +
@@ -144,23 +581,27 @@ def crear_grafico_html_interactivo(
         ))
     
     # Agregar texto con el total en la parte superior de cada barra (más visible y destacado)
-    valores_totales = [categorias[cat] for cat in nombres]
-    porcentajes = [(v / total) * 100 for v in valores_totales]
-    max_valor = max(valores_totales)
+    # (los totales salen de categorias y no de la suma de la matriz, por si hay niveles fuera de la lista)
+    valores_totales = np.array(conteos, dtype=np.int32)
+    porcentajes = valores_totales / total * 100
+    max_valor = int(valores_totales.max())
     
     # Calcular posición Y basada en el valor máximo para que todas las barras tengan la misma altura de texto
     # Esto asegura que las barras más cortas también tengan sus números bien posicionados
-    y_positions = [max_valor * 1.25 for _ in valores_totales]  # Posición fija basada en el máximo
+    y_positions = np.full(len(valores_totales), max_valor * 1.25)  # Posición fija basada en el máximo
     
-    fig.add_trace(go.Scatter(
-        x=nombres,
-        y=y_positions,  # Usar posición fija basada en el valor máximo
-        mode='text',
-        text=[f"<b>{v}</b><br><b>({p:.1f}%)</b>" for v, p in zip(valores_totales, porcentajes)],
-        textfont=dict(size=16, color='#1a252f', family='Segoe UI, Tahoma, Geneva, Verdana, sans-serif'),
-        showlegend=False,
-        hoverinfo='skip'
-    ))
+    # Anotaciones del layout en lugar de una traza de texto: no agregan una serie
+    # más que Plotly tenga que dibujar y no responden a clics ni al hover
+    anotaciones_totales = [
+        dict(
+            x=categoria,
+            y=y,  # Usar posición fija basada en el valor máximo
+            text=f"<b>{v}</b><br><b>({p:.1f}%)</b>",
+            showarrow=False,
+            font=dict(size=16, color='#1a252f', family='Segoe UI, Tahoma, Geneva, Verdana, sans-serif')
+        )
+        for categoria, y, v, p in zip(nombres, y_positions.tolist(), valores_totales.tolist(), porcentajes.tolist())
+    ]
 
     # Personalizar el layout con estilo moderno
     fig.update_layout(
@@ -210,47 +651,54 @@ def crear_grafico_html_interactivo(
             font_family='Segoe UI, Tahoma, Geneva, Verdana, sans-serif',
             font_color='white'
         ),
-        font=dict(family='Segoe UI, Tahoma, Geneva, Verdana, sans-serif')
+        font=dict(family='Segoe UI, Tahoma, Geneva, Verdana, sans-serif'),
+        annotations=anotaciones_totales,
+        # Sin animaciones, y con uirevision fijo Plotly conserva el estado de la
+        # interfaz (zoom, leyenda) sin recalcular el layout en cada interacción
+        transition=dict(duration=0),
+        uirevision='const'
     )
 
-    # Preparar datos para JavaScript (información de subcategorías y estudios completos)
-    datos_js = {}
-    for categoria in nombres:
+    # Preparar datos para JavaScript (información de subcategorías, una entrada
+    # por categoría en el orden de las barras); los estudios
+    # van aparte como TSV y el navegador los separa por categoría al primer clic.
+    # Las categorías con más de LIMITE_ESTUDIOS_INLINE estudios indican el archivo
+    # con los que no caben en el HTML. El nombre de la subcategoría se inserta
+    # como HTML en el panel de detalles, así que se escapa aquí una sola vez
+    estudios_inline, estudios_restantes = repartir_estudios(estudios, LIMITE_ESTUDIOS_INLINE)
+    archivos_estudios: Dict[str, str] = {}
+    datos_js = []
+    for i, categoria in enumerate(nombres):
         subcats = subcategorias_por_categoria[categoria]
-        estudios_categoria = estudios_por_categoria[categoria]
-        
-        # Preparar lista de estudios con información relevante
-        estudios_lista = []
-        for estudio in estudios_categoria:
-            estudios_lista.append({
-                'title': normalizar_texto(estudio.get('Title', ''), '[Sin título]'),
-                'author': normalizar_texto(estudio.get('Author', ''), '[Sin autor]'),
-                'year': normalizar_texto(estudio.get('Year', ''), '[Sin año]'),
-                'subcategory': normalizar_texto(estudio.get('Subcategory', ''), '[Sin subcategoría]'),
-                'suitability': normalizar_texto(estudio.get('TCIM_suitability_level', ''), 'N/A')
-            })
         
-        datos_js[categoria] = {
+        datos = {
             'subcategorias': [
-                {'nombre': subcat, 'count': count}
+                {'nombre': html.escape(subcat), 'count': count}
                 for subcat, count in subcats.most_common()
             ],
-            'total': categorias[categoria],
-            'estudios': estudios_lista
+            'total': categorias[categoria]
         }
+        if categoria in estudios_restantes:
+            archivo = f"{os.path.basename(DIR_ESTUDIOS)}/{i}.tsv"
+            archivos_estudios[archivo] = categoria
+            datos['archivo'] = archivo
+        datos_js.append(datos)
 
-    # Generar el div del gráfico
-    html_content = pyo.plot(fig, output_type='div', include_plotlyjs=False)
+    # Generar el div del gráfico; incluye la etiqueta <script> de Plotly desde la
+    # copia local (con la versión que corresponde a la librería instalada) y omite
+    # la validación de la figura, que ya se construyó con go.Bar y anotaciones del layout
+    html_content = pio.to_html(fig, include_plotlyjs=copiar_plotly_local(), full_html=False, validate=False, config={'responsive': True, 'displaylogo': False}, div_id=ID_GRAFICO)
     
-    # Crear HTML completo con JavaScript para manejar clicks
-    html_completo = f"""<!DOCTYPE html>
+    # Crear HTML completo con JavaScript para manejar clicks; se arma como una
+    # lista de fragmentos para no copiar el gráfico y los datos embebidos en un
+    # único texto antes de escribirlo
+    fragmentos = [
+        f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Interactive Chart - Studies by Category</title>
-    <!-- Cargar Plotly desde CDN (versión 2.27.0 - compatible con plotly Python 6.5.0) -->
-    <script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
     <style>
         body {{
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -333,6 +781,13 @@ def crear_grafico_html_interactivo(
             margin-top: 0;
             margin-bottom: 20px;
         }}
+        #tabla-aviso {{
+            margin: 0 0 15px;
+            padding: 10px 15px;
+            background-color: #fdf2e9;
+            border-left: 4px solid #e67e22;
+            color: #7e5109;
+        }}
         .tabla-container {{
             overflow-x: auto;
             max-height: 600px;
@@ -432,13 +887,16 @@ def crear_grafico_html_interactivo(
         <div class="click-instruction">
             💡 <strong>Click on any bar</strong> to view subcategory details and the complete table of studies
         </div>
-        <div id="grafico">{html_content}</div>
+        <div id="grafico">""",
+        html_content,
+        """</div>
         <div id="detalles">
             <h2 id="detalles-titulo"></h2>
             <div id="detalles-contenido"></div>
         </div>
         <div id="tabla-estudios">
             <h2 id="tabla-titulo"></h2>
+            <p id="tabla-aviso" hidden></p>
             <div class="tabla-container">
                 <table id="tabla-estudios-content">
                     <thead>
@@ -458,49 +916,112 @@ def crear_grafico_html_interactivo(
         </div>
     </div>
 
+    <script type="text/tab-separated-values" id="datos-estudios">
+""",
+        estudios_a_tsv(estudios_inline),
+        """
+    </script>
     <script>
         // Subcategory data
-        const datosSubcategorias = {json.dumps(datos_js, ensure_ascii=False, indent=8)};
+        const datosSubcategorias = """,
+        a_json(datos_js),
+        f""";
 
-        // Function to get CSS class for badge based on suitability level
-        function obtenerClaseBadge(suitability) {{
-            const nivel = suitability.toLowerCase();
-            if (nivel.includes('high')) return 'badge-high';
-            if (nivel.includes('moderate')) return 'badge-moderate';
-            if (nivel.includes('low')) return 'badge-low';
-            return 'badge-na';
+        // Studies by category, parsed from the embedded TSV block on first use
+        let estudiosPorCategoria = null;
+        const ESCAPES_TSV = {{ t: '\\t', n: '\\n', r: '\\r', l: '<' }};
+
+        // Append the studies of a TSV text to estudiosPorCategoria. The first line
+        // is the table of repeated texts; rows refer to it by index for every
+        // column except title and author
+        function agregarEstudiosTsv(texto) {{
+            const desescapar = function(valor) {{
+                return valor.replace(/\\\\(.)/g, function(_, c) {{ return ESCAPES_TSV[c] || c; }});
+            }};
+            const lineas = texto.replace(/^\\n/, '').split('\\n');
+            const textos = lineas[0].split('\\t').map(desescapar);
+            for (let i = 1; i < lineas.length; i++) {{
+                const campos = lineas[i].trim() ? lineas[i].split('\\t') : null;
+                if (!campos || campos.length < 7) continue;
+                const categoria = textos[campos[0]];
+                if (!estudiosPorCategoria[categoria]) estudiosPorCategoria[categoria] = [];
+                estudiosPorCategoria[categoria].push({{
+                    title: desescapar(campos[1]),
+                    author: desescapar(campos[2]),
+                    year: textos[campos[3]],
+                    subcategory: textos[campos[4]],
+                    suitability: textos[campos[5]],
+                    badge: textos[campos[6]]
+                }});
+            }}
+        }}
+
+        function obtenerEstudios(categoria) {{
+            if (estudiosPorCategoria === null) {{
+                estudiosPorCategoria = {{}};
+                agregarEstudiosTsv(document.getElementById('datos-estudios').textContent);
+            }}
+            return estudiosPorCategoria[categoria];
+        }}
+
+        // Studies that did not fit in the HTML are fetched once per category;
+        // the promise is kept so repeated clicks share the same request. A failed
+        // request (e.g. fetch() is blocked on file://) is forgotten, so the next
+        // click retries it, and the rejection reaches the caller
+        const cargasEstudios = {{}};
+        let categoriaActual = null;
+
+        function cargarEstudiosRestantes(indice, categoria) {{
+            const archivo = datosSubcategorias[indice] && datosSubcategorias[indice].archivo;
+            if (!archivo) return null;
+            if (!cargasEstudios[categoria]) {{
+                cargasEstudios[categoria] = fetch(archivo)
+                    .then(function(r) {{ return r.ok ? r.text() : Promise.reject(new Error(r.status)); }})
+                    .then(function(texto) {{
+                        agregarEstudiosTsv(texto);
+                        delete permutacionesPorCategoria[categoria];
+                        delete datosSubcategorias[indice].archivo;
+                    }})
+                    .catch(function(error) {{
+                        delete cargasEstudios[categoria];
+                        throw error;
+                    }});
+            }}
+            return cargasEstudios[categoria];
         }}
 
         // Function to display subcategory details
-        function mostrarDetalles(categoria, total) {{
+        const DETALLES_INICIO = '<div style="margin-top: 15px;">' +
+            '<h3 style="color: #34495e; margin-bottom: 15px;">Subcategories:</h3>';
+        const DETALLES_FIN = '</div>';
+
+        function mostrarDetalles(indice, categoria, total) {{
             const detallesDiv = document.getElementById('detalles');
             const tituloDiv = document.getElementById('detalles-titulo');
             const contenidoDiv = document.getElementById('detalles-contenido');
             
-            if (!datosSubcategorias[categoria]) {{
+            if (!datosSubcategorias[indice]) {{
                 contenidoDiv.innerHTML = '<p>No information available for this category.</p>';
                 detallesDiv.style.display = 'block';
                 return;
             }}
             
-            const datos = datosSubcategorias[categoria];
+            const datos = datosSubcategorias[indice];
             tituloDiv.textContent = `📁 ${{categoria}} - ${{total}} studies`;
             
-            let html = '<div style="margin-top: 15px;">';
-            html += '<h3 style="color: #34495e; margin-bottom: 15px;">Subcategories:</h3>';
-            
+            // Pieces are collected in an array and joined once
+            const partes = [DETALLES_INICIO];
             datos.subcategorias.forEach(function(subcat) {{
                 const porcentaje = ((subcat.count / total) * 100).toFixed(1);
-                html += `
+                partes.push(`
                     <div class="subcategoria-item">
                         <span class="subcategoria-nombre">${{subcat.nombre}}</span>
                         <span class="subcategoria-count">${{subcat.count}} studies (${{porcentaje}}%)</span>
                     </div>
-                `;
+                `);
             }});
-            
-            html += '</div>';
-            contenidoDiv.innerHTML = html;
+            partes.push(DETALLES_FIN);
+            contenidoDiv.innerHTML = partes.join('');
             detallesDiv.style.display = 'block';
             
             // Scroll suave hacia el panel de subcategorías
@@ -512,25 +1033,146 @@ def crear_grafico_html_interactivo(
         // Variable para almacenar los estudios actuales y el orden actual
         let estudiosActuales = [];
         let ordenActual = {{ column: null, direction: 'asc' }};
+        // Sort permutations per category and column, computed on first use
+        const permutacionesPorCategoria = {{}};
+        let permutacionesActuales = {{}};
+
+        // Sort key of a study for a column
+        function claveOrden(estudio, column) {{
+            const valor = estudio[column];
+            if (column === 'year') {{
+                // Sort by year as number
+                return parseInt(valor) || 0;
+            }}
+            // Sort as string (case insensitive)
+            return (valor || '').toString().toLowerCase();
+        }}
+
+        // Returns the indices of estudiosActuales in sorted order. The ascending
+        // order is sorted once per column; the descending one is derived from it by
+        // reversing the groups of equal keys, keeping each group in its original
+        // order as the stable sort with the inverted comparison did
+        function obtenerPermutacion(column, direction) {{
+            if (!permutacionesActuales[column]) {{
+                const claves = estudiosActuales.map(function(estudio) {{ return claveOrden(estudio, column); }});
+                const asc = estudiosActuales.map(function(_, i) {{ return i; }}).sort(function(a, b) {{
+                    if (claves[a] < claves[b]) return -1;
+                    if (claves[a] > claves[b]) return 1;
+                    return 0;
+                }});
+                
+                const desc = [];
+                let fin = asc.length;
+                while (fin > 0) {{
+                    let inicio = fin - 1;
+                    while (inicio > 0 && claves[asc[inicio - 1]] === claves[asc[fin - 1]]) inicio--;
+                    for (let k = inicio; k < fin; k++) desc.push(asc[k]);
+                    fin = inicio;
+                }}
+                
+                permutacionesActuales[column] = {{ asc: asc, desc: desc }};
+            }}
+            return permutacionesActuales[column][direction];
+        }}
+
+        // Virtual scrolling: above this many studies only the rows around the visible
+        // part of the table container are in the DOM, between two spacer rows
+        const UMBRAL_VIRTUALIZACION = 200;
+        const FILAS_VENTANA = 30;
+        const FILAS_MARGEN = 10;
+        const ALTO_FILA_ESTIMADO = 41;
+        let filasTabla = [];
+        let altoFila = 0;
+        let ventanaPendiente = false;
+
+        // Builds the <tr> of a study
+        function crearFilaEstudio(estudio, numero) {{
+            const row = document.createElement('tr');
+            [numero, estudio.title, estudio.author, estudio.year, estudio.subcategory].forEach(function(valor) {{
+                const celda = document.createElement('td');
+                celda.textContent = valor;
+                row.appendChild(celda);
+            }});
+            
+            const celdaBadge = document.createElement('td');
+            const badge = document.createElement('span');
+            badge.className = 'badge ' + estudio.badge;
+            badge.textContent = estudio.suitability;
+            celdaBadge.appendChild(badge);
+            row.appendChild(celdaBadge);
+            return row;
+        }}
+
+        // Empty row that takes the height of the rows that are not rendered
+        function crearFilaEspaciadora(alto) {{
+            const row = document.createElement('tr');
+            row.style.background = 'transparent';
+            const celda = document.createElement('td');
+            celda.colSpan = 6;
+            celda.style.cssText = 'padding: 0; border: none; height: ' + alto + 'px;';
+            row.appendChild(celda);
+            return row;
+        }}
 
         // Function to render table rows
+        // Rows are built as detached elements in a DocumentFragment and inserted in
+        // a single replaceChildren call, so the HTML parser never runs per row
         function renderizarFilasTabla(estudios) {{
-            const tablaBody = document.getElementById('tabla-estudios-body');
-            tablaBody.innerHTML = '';
+            filasTabla = estudios;
+            if (estudios.length > UMBRAL_VIRTUALIZACION) {{
+                renderizarVentana();
+                return;
+            }}
             
+            const tablaBody = document.getElementById('tabla-estudios-body');
+            const fragmento = document.createDocumentFragment();
             estudios.forEach(function(estudio, index) {{
-                const row = document.createElement('tr');
-                const badgeClass = obtenerClaseBadge(estudio.suitability);
-                
-                row.innerHTML = `
-                    <td>${{index + 1}}</td>
-                    <td>${{estudio.title}}</td>
-                    <td>${{estudio.author}}</td>
-                    <td>${{estudio.year}}</td>
-                    <td>${{estudio.subcategory}}</td>
-                    <td><span class="badge ${{badgeClass}}">${{estudio.suitability}}</span></td>
-                `;
-                tablaBody.appendChild(row);
+                fragmento.appendChild(crearFilaEstudio(estudio, index + 1));
+            }});
+            tablaBody.replaceChildren(fragmento);
+        }}
+
+        // Renders only the rows of filasTabla that fall inside the scrolled window
+        function renderizarVentana() {{
+            const tablaBody = document.getElementById('tabla-estudios-body');
+            const contenedor = tablaBody.closest('.tabla-container');
+            const alto = altoFila || ALTO_FILA_ESTIMADO;
+            
+            let primera = Math.floor(contenedor.scrollTop / alto) - FILAS_MARGEN;
+            primera = Math.max(0, Math.min(primera, filasTabla.length - FILAS_VENTANA - FILAS_MARGEN));
+            // Odd start (after the top spacer) keeps the even-row striping of the full table
+            if (primera > 0 && primera % 2 === 0) primera--;
+            const ultima = Math.min(filasTabla.length, primera + FILAS_VENTANA + 2 * FILAS_MARGEN);
+            
+            const fragmento = document.createDocumentFragment();
+            if (primera > 0) fragmento.appendChild(crearFilaEspaciadora(primera * alto));
+            for (let i = primera; i < ultima; i++) {{
+                fragmento.appendChild(crearFilaEstudio(filasTabla[i], i + 1));
+            }}
+            if (ultima < filasTabla.length) fragmento.appendChild(crearFilaEspaciadora((filasTabla.length - ultima) * alto));
+            tablaBody.replaceChildren(fragmento);
+            
+            // Measure the real row height once the rows are visible
+            if (!altoFila) {{
+                const filas = Array.from(tablaBody.rows).slice(primera > 0 ? 1 : 0, primera > 0 ? 1 + ultima - primera : ultima - primera);
+                const medido = filas.reduce(function(suma, fila) {{ return suma + fila.offsetHeight; }}, 0) / (filas.length || 1);
+                if (medido > 0) {{
+                    altoFila = medido;
+                    renderizarVentana();
+                }}
+            }}
+        }}
+
+        // Re-render the window on scroll, at most once per animation frame
+        function configurarScrollTabla() {{
+            const contenedor = document.querySelector('#tabla-estudios .tabla-container');
+            contenedor.addEventListener('scroll', function() {{
+                if (filasTabla.length <= UMBRAL_VIRTUALIZACION || ventanaPendiente) return;
+                ventanaPendiente = true;
+                requestAnimationFrame(function() {{
+                    ventanaPendiente = false;
+                    renderizarVentana();
+                }});
             }});
         }}
 
@@ -546,25 +1188,9 @@ def crear_grafico_html_interactivo(
                 ordenActual.direction = 'asc';
             }}
             
-            // Sort studies
-            const estudiosOrdenados = [...estudiosActuales].sort(function(a, b) {{
-                let aVal = a[column];
-                let bVal = b[column];
-                
-                // Handle different data types
-                if (column === 'year') {{
-                    // Sort by year as number
-                    aVal = parseInt(aVal) || 0;
-                    bVal = parseInt(bVal) || 0;
-                }} else {{
-                    // Sort as string (case insensitive)
-                    aVal = (aVal || '').toString().toLowerCase();
-                    bVal = (bVal || '').toString().toLowerCase();
-                }}
-                
-                if (aVal < bVal) return ordenActual.direction === 'asc' ? -1 : 1;
-                if (aVal > bVal) return ordenActual.direction === 'asc' ? 1 : -1;
-                return 0;
+            // Sort studies using the cached permutation for this column and direction
+            const estudiosOrdenados = obtenerPermutacion(column, ordenActual.direction).map(function(i) {{
+                return estudiosActuales[i];
             }});
             
             // Update sort indicators
@@ -580,18 +1206,24 @@ def crear_grafico_html_interactivo(
         }}
 
         // Function to display studies table
-        function mostrarTablaEstudios(categoria, total) {{
+        function mostrarTablaEstudios(indice, categoria, total) {{
             const tablaDiv = document.getElementById('tabla-estudios');
             const tablaTitulo = document.getElementById('tabla-titulo');
             const tablaBody = document.getElementById('tabla-estudios-body');
+            const tablaAviso = document.getElementById('tabla-aviso');
+            tablaAviso.hidden = true;
             
-            if (!datosSubcategorias[categoria] || !datosSubcategorias[categoria].estudios) {{
+            const estudios = obtenerEstudios(categoria);
+            if (!estudios) {{
                 tablaBody.innerHTML = '<tr><td colspan="6">No studies available for this category.</td></tr>';
                 tablaDiv.style.display = 'block';
                 return;
             }}
             
-            estudiosActuales = datosSubcategorias[categoria].estudios;
+            categoriaActual = categoria;
+            estudiosActuales = estudios;
+            if (!permutacionesPorCategoria[categoria]) permutacionesPorCategoria[categoria] = {{}};
+            permutacionesActuales = permutacionesPorCategoria[categoria];
             tablaTitulo.textContent = `📋 Studies List: ${{categoria}} (${{total}} studies)`;
             
             // Reset sort
@@ -600,127 +1232,229 @@ def crear_grafico_html_interactivo(
                 th.classList.remove('sort-asc', 'sort-desc');
             }});
             
+            // Show the table (before rendering, so virtualized rows can be measured)
+            tablaDiv.style.display = 'block';
+            
             // Render initial table
+            altoFila = 0;
+            if (estudiosActuales.length > UMBRAL_VIRTUALIZACION) {{
+                tablaBody.closest('.tabla-container').scrollTop = 0;
+            }}
             renderizarFilasTabla(estudiosActuales);
             
-            // Re-configure sort listeners after rendering
-            configurarOrdenamientoTabla();
-            
-            // Show the table
-            tablaDiv.style.display = 'block';
+            // Fetch the rest of the studies and re-render if the category is still shown;
+            // if they cannot be loaded, say how many rows are missing
+            const carga = cargarEstudiosRestantes(indice, categoria);
+            if (carga) {{
+                carga.then(function() {{
+                    if (categoriaActual === categoria && !datosSubcategorias[indice].archivo) {{
+                        mostrarTablaEstudios(indice, categoria, total);
+                    }}
+                }}, function() {{
+                    if (categoriaActual !== categoria) return;
+                    tablaAviso.textContent = `Showing ${{estudios.length}} of ${{datosSubcategorias[indice].total}} studies: ` +
+                        'the rest could not be loaded. Serve docs/ over HTTP (e.g. python -m http.server -d docs) to see them all.';
+                    tablaAviso.hidden = false;
+                }});
+            }}
             
             // Don't scroll to table, let it stay where subcategories are
         }}
 
-        // Add click event listeners to sortable headers
+        // Single delegated click listener on the table header: it survives every
+        // re-render of the rows, so it is attached once
         function configurarOrdenamientoTabla() {{
-            // Remove existing listeners by using a flag
-            document.querySelectorAll('th.sortable').forEach(function(th) {{
-                // Remove old listener if exists
-                if (th._sortHandler) {{
-                    th.removeEventListener('click', th._sortHandler);
-                }}
-                
-                // Create new handler
-                th._sortHandler = function(e) {{
-                    e.preventDefault();
-                    e.stopPropagation();
-                    ordenarTabla(th.dataset.sort);
-                }};
-                
-                // Add new event listener
-                th.addEventListener('click', th._sortHandler);
+            document.querySelector('#tabla-estudios-content thead').addEventListener('click', function(e) {{
+                const th = e.target.closest('th.sortable');
+                if (!th) return;
+                e.preventDefault();
+                e.stopPropagation();
+                ordenarTabla(th.dataset.sort);
             }});
         }}
 
         // Function to configure Plotly event listeners
+        // The Plotly <script> emitted with the chart div is synchronous and runs
+        // before this one, so the graph already exists here: one lookup, one listener
+        const RETARDO_CLIC = 50;
+
         function configurarInteractividad() {{
-            // Find all Plotly graph elements
-            const allPlotDivs = document.querySelectorAll('[id*="plotly"], .plotly-graph-div');
+            const plotDiv = document.getElementById('{ID_GRAFICO}');
+            if (!plotDiv || !plotDiv.on) return;
             
-            allPlotDivs.forEach(function(plotDiv) {{
-                // Check if the graph already has data and doesn't have the handler
-                if (plotDiv.data && !plotDiv._clickHandlerAdded) {{
-                    plotDiv._clickHandlerAdded = true;
+            // Clicks closer together than RETARDO_CLIC ms (e.g. a double click)
+            // rebuild the panels only once, for the last one
+            let temporizadorClic = null;
+            plotDiv.on('plotly_click', function(data) {{
+                if (data.points && data.points.length > 0) {{
+                    const punto = data.points[0];
+                    const indice = punto.customdata;
+                    const categoria = punto.x;
+                    const count = punto.y;
                     
-                    // Add event listener for clicks
-                    plotDiv.on('plotly_click', function(data) {{
-                        if (data.points && data.points.length > 0) {{
-                            const punto = data.points[0];
-                            const categoria = punto.x;
-                            const count = punto.y;
-                            
-                            // Show subcategory details
-                            mostrarDetalles(categoria, count);
-                            
-                            // Show studies table
-                            mostrarTablaEstudios(categoria, count);
-                        }}
-                    }});
+                    clearTimeout(temporizadorClic);
+                    temporizadorClic = setTimeout(function() {{
+                        // Show subcategory details
+                        mostrarDetalles(indice, categoria, count);
+                        
+                        // Show studies table
+                        mostrarTablaEstudios(indice, categoria, count);
+                    }}, RETARDO_CLIC);
                 }}
             }});
-            
-            // If no graph found, try again after a delay
-            if (allPlotDivs.length === 0 || !Array.from(allPlotDivs).some(d => d.data)) {{
-                setTimeout(configurarInteractividad, 500);
-            }}
         }}
 
-        // Function to wait for Plotly to be available
-        function esperarPlotly() {{
-            if (window.Plotly) {{
-                // Plotly is loaded, wait for DOM to be ready
-                if (document.readyState === 'loading') {{
-                    document.addEventListener('DOMContentLoaded', function() {{
-                        configurarInteractividad();
-                        configurarOrdenamientoTabla();
-                    }});
-                }} else {{
-                    // DOM is already ready, but wait a bit more for Plotly to render
-                    setTimeout(function() {{
-                        configurarInteractividad();
-                        configurarOrdenamientoTabla();
-                    }}, 300);
-                }}
-            }} else {{
-                // Plotly is not loaded yet, try again
-                setTimeout(esperarPlotly, 100);
-            }}
-        }}
-
-        // Start waiting when page loads
-        if (document.readyState === 'loading') {{
-            document.addEventListener('DOMContentLoaded', function() {{
-                esperarPlotly();
-                configurarOrdenamientoTabla();
-            }});
-        }} else {{
-            esperarPlotly();
+        // Set everything up once, when the document has been parsed
+        document.addEventListener('DOMContentLoaded', function() {{
+            configurarInteractividad();
             configurarOrdenamientoTabla();
-        }}
+            configurarScrollTabla();
+        }});
     </script>
 </body>
-</html>"""
+</html>""",
+    ]
 
     # Guardar el HTML en la carpeta docs
     os.makedirs('docs', exist_ok=True)  # Crear carpeta docs si no existe
-    nombre_archivo = "docs/grafico_interactivo.html"
-    with open(nombre_archivo, 'w', encoding='utf-8') as f:
-        f.write(html_completo)
+    nombre_archivo = HTML_FILE
+    with open(nombre_archivo, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(fragmentos)
+    # Copia comprimida para servidores estáticos que sirven el .gz directamente
+    with gzip.open(nombre_archivo + '.gz', 'wt', encoding='utf-8', compresslevel=6) as f:
+        f.writelines(fragmentos)
+
+    # Estudios que no caben en el HTML; se eliminan los de una ejecución anterior
+    if os.path.isdir(DIR_ESTUDIOS):
+        for archivo in os.listdir(DIR_ESTUDIOS):
+            if archivo.endswith('.tsv'):
+                os.remove(os.path.join(DIR_ESTUDIOS, archivo))
+    if archivos_estudios:
+        os.makedirs(DIR_ESTUDIOS, exist_ok=True)
+        for archivo, categoria in archivos_estudios.items():
+            with open(os.path.join(os.path.dirname(HTML_FILE), archivo), 'w', encoding='utf-8') as f:
+                f.write(estudios_a_tsv(estudios_restantes[categoria]))
     
-    print(f"\n✅ Interactive HTML chart generated: '{nombre_archivo}'")
-    print(f"   Open the file in your browser to view the interactive chart.")
-    print(f"   Click on the bars to view subcategory details and the studies table.")
+    print(f"\n✅ Interactive HTML chart generated: '{nombre_archivo}' (and '{nombre_archivo}.gz')")
+    if archivos_estudios:
+        # fetch() de los TSV aparte está bloqueado al abrir el HTML como file://
+        carpeta = os.path.dirname(nombre_archivo) or "."
+        print(f"   Serve it over HTTP to view it (e.g. python -m http.server -d {carpeta}): opened from disk,")
+        print(f"   categories with more than {LIMITE_ESTUDIOS_INLINE} studies only list the first {LIMITE_ESTUDIOS_INLINE}.")
+    else:
+        print("   Open the file in your browser to view the interactive chart.")
+    print("   Click on the bars to view subcategory details and the studies table.")
+    return True
+
+
+def firma_csv(archivo_csv: str) -> Optional[str]:
+    """
+    Huella BLAKE2b del CSV, de este script (y de agrupar_estudios.py) y de la
+    versión de Plotly: el HTML es función solo de ellos. La versión se lee de
+    los metadatos del paquete, sin importar Plotly.
+
+    Returns:
+        El hash en hexadecimal, o None si el CSV no existe.
+    """
+    if not os.path.exists(archivo_csv):
+        return None
+    # Importación diferida: importlib.metadata tarda más que el resto de la biblioteca estándar usada
+    import importlib.metadata
+
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        h.update(importlib.metadata.version("plotly").encode("utf-8"))
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    # agrupar_estudios.py también cuenta: de él sale la detección de la codificación
+    modulo_encoding = sys.modules[detectar_encoding.__module__].__file__
+    for ruta in (archivo_csv, os.path.abspath(__file__), os.path.abspath(modulo_encoding)):
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+    return h.hexdigest()
+
+
+def archivos_generados() -> List[str]:
+    """
+    Archivos que el HTML carga aparte: la copia local de plotly.js (si no se usó
+    el CDN) y los TSV de DIR_ESTUDIOS, como rutas relativas a la carpeta del HTML.
+    """
+    from plotly.offline import get_plotlyjs_version
+
+    carpeta = os.path.dirname(HTML_FILE)
+    archivos = [f"plotly-{get_plotlyjs_version()}.min.js"]
+    if os.path.isdir(DIR_ESTUDIOS):
+        archivos += sorted(
+            f"{os.path.basename(DIR_ESTUDIOS)}/{archivo}"
+            for archivo in os.listdir(DIR_ESTUDIOS) if archivo.endswith('.tsv')
+        )
+    return [archivo for archivo in archivos if os.path.exists(os.path.join(carpeta, archivo))]
+
+
+def html_actualizado(firma: Optional[str]) -> bool:
+    """
+    Indica si el HTML existente se generó a partir de la misma firma y siguen
+    existiendo los archivos que carga aparte.
+
+    HASH_FILE guarda la firma en la primera línea y, en las siguientes, los
+    archivos que devolvió archivos_generados() al escribir el HTML.
+    """
+    if firma is None or not os.path.exists(HTML_FILE):
+        return False
+    try:
+        with open(HASH_FILE, "r", encoding="utf-8") as f:
+            lineas = f.read().splitlines()
+    except OSError:
+        return False
+    if not lineas or lineas[0] != firma:
+        return False
+    carpeta = os.path.dirname(HTML_FILE)
+    return all(os.path.exists(os.path.join(carpeta, archivo)) for archivo in lineas[1:])
+
+
+def imprimir_resumen(categorias: Counter) -> None:
+    """Imprime el número de estudios por categoría, de mayor a menor."""
+    total = sum(categorias.values())
+    print(f"\nTotal studies analyzed: {total}\n")
+    for categoria, count in categorias.most_common():
+        print(f"- {categoria}: {count} ({count / total * 100:.1f}%)")
 
 
 def main() -> None:
-    filas = leer_csv(CSV_FILE)
-    if not filas:
+    parser = argparse.ArgumentParser(description="Genera el gráfico interactivo en HTML de los estudios por categoría.")
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="solo muestra los conteos por categoría, sin importar Plotly ni generar el HTML",
+    )
+    args = parser.parse_args()
+
+    if args.summary_only:
+        categorias, _, _, _ = agrupar_archivo(CSV_FILE)
+        if not categorias:
+            print("The file contains no data.")
+            return
+        imprimir_resumen(categorias)
+        return
+
+    # Si el CSV, el script y Plotly no cambiaron, el HTML ya generado sigue siendo válido
+    firma = firma_csv(CSV_FILE)
+    if html_actualizado(firma):
+        print(f"✅ '{HTML_FILE}' is already up to date with '{CSV_FILE}'.")
+        return
+
+    categorias, subcategorias_por_categoria, estudios, suitability_por_categoria = agrupar_archivo(CSV_FILE)
+    if not categorias:
         print("The file contains no data.")
         return
 
-    categorias, subcategorias_por_categoria, estudios_por_categoria, suitability_por_categoria = agrupar_estudios(filas)
-    crear_grafico_html_interactivo(categorias, subcategorias_por_categoria, estudios_por_categoria, suitability_por_categoria)
+    if crear_grafico_html_interactivo(categorias, subcategorias_por_categoria, estudios, suitability_por_categoria):
+        try:
+            with open(HASH_FILE, "w", encoding="utf-8") as f:
+                f.write("\n".join([firma, *archivos_generados()]))
+        except OSError:
+            pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""
+Comprueba que todas las formas de agrupar un archivo dan el mismo resultado,
+incluido el orden de los empates de most_common(), y que la caché de conteos
+se reutiliza mientras el CSV no cambie.
+"""
+
+import os
+
+import pytest
+
+import agrupar_estudios as ae
+
+ARCHIVOS = {
+    "empates": (
+        b"Category,Subcategory,Title\n"
+        b"Zeta,s1,a\nAlpha,s2,b\nMid,s3,c\nBeta,s4,d\nZeta,s5,e\nAlpha,s6,f\nMid,s7,g\n"
+    ),
+    "crlf_y_vacias": (
+        b"Title,Category,Subcategory\r\n"
+        b"a,A, x \r\n\r\nb, ,y\r\nc,B\r\nd,A,\r\ne,B,z\r\n"
+    ),
+    "comillas": (
+        b"Category,Subcategory,Title\n"
+        b'"A, B",x,"t\nmultil\xc3\xadnea"\n'
+        b'C,"y ""z""",t\n'
+        b'"A, B",x,u\n'
+        b"C,w,v"
+    ),
+    "comillas_crlf": b'Title,Category,Subcategory\r\nt,"A",\r\nu,B,"x, y"\r\nv,"A",""\r\n',
+    "solo_cr": b"Category,Subcategory\rA,x\rB,y\rA,x\r",
+    "latin1": b"Category,Subcategory\nCaf\xe9,\xf1u\nCaf\xe9,\xf1u\nT\xe9,x\n",
+}
+
+
+def _normalizar(resultado):
+    """Convierte los Counter en listas ordenadas como las imprime el script."""
+    categorias, subcategorias, n_filas = resultado
+    return (
+        categorias.most_common(),
+        [(cat, subcategorias[cat].most_common()) for cat, _ in categorias.most_common()],
+        n_filas,
+    )
+
+
+@pytest.fixture(params=sorted(ARCHIVOS))
+def archivo(request, tmp_path):
+    ruta = tmp_path / f"{request.param}.csv"
+    ruta.write_bytes(ARCHIVOS[request.param])
+    return str(ruta)
+
+
+def _esperado(archivo):
+    return _normalizar(ae.agrupar_estudios(ae.iter_csv(archivo)))
+
+
+def test_empates_en_orden_de_aparicion(tmp_path):
+    ruta = tmp_path / "empates.csv"
+    ruta.write_bytes(ARCHIVOS["empates"])
+    categorias, _, _ = _esperado(str(ruta))
+    assert [cat for cat, _ in categorias] == ["Zeta", "Alpha", "Mid", "Beta"]
+
+
+def test_numba_igual_que_csv(archivo):
+    pytest.importorskip("numba")
+    with open(archivo, "rb") as f:
+        resultado = ae.agrupar_bytes(f.read(), ae.detectar_encoding(archivo))
+    if resultado is None:
+        # Saltos '\r' sueltos: agrupar_archivo usa entonces el módulo csv
+        assert archivo.endswith("solo_cr.csv")
+        return
+    assert _normalizar(resultado) == _esperado(archivo)
+
+
+def test_sin_comillas_igual_que_csv(archivo):
+    resultado = ae.agrupar_sin_comillas(archivo, ae.detectar_encoding(archivo))
+    if resultado is None:
+        with open(archivo, "rb") as f:
+            crudo = f.read()
+        assert b'"' in crudo or b"\r" in crudo.replace(b"\r\n", b"")
+        return
+    assert _normalizar(resultado) == _esperado(archivo)
+
+
+def test_paralelo_igual_que_csv(archivo):
+    resultado = ae.agrupar_en_paralelo(archivo, ae.detectar_encoding(archivo), 2)
+    if resultado is None:
+        assert archivo.endswith("solo_cr.csv")
+        return
+    assert _normalizar(resultado) == _esperado(archivo)
+
+
+def test_agrupar_archivo_igual_que_csv(archivo):
+    assert _normalizar(ae.agrupar_archivo(archivo)) == _esperado(archivo)
+
+
+def test_agrupar_archivo_grande_igual_que_csv(archivo, monkeypatch):
+    # Umbrales a cero: agrupar_archivo elige las rutas de los archivos grandes
+    monkeypatch.setattr(ae, "UMBRAL_NUMBA_BYTES", 0)
+    monkeypatch.setattr(ae, "UMBRAL_PARALELO_BYTES", 0)
+    assert _normalizar(ae.agrupar_archivo(archivo)) == _esperado(archivo)
+
+
+@pytest.mark.parametrize("contenido, esperado", [
+    (b"Category\nA\n", "utf-8"),
+    (b"\xef\xbb\xbfCategory\nA\n", "utf-8-sig"),
+    (b"Category\nCaf\xc3\xa9\n", "utf-8"),
+    (b"Category\nEst\x87ndares\n", "mac_roman"),
+])
+def test_detectar_encoding(tmp_path, contenido, esperado):
+    ruta = tmp_path / "datos.csv"
+    ruta.write_bytes(contenido)
+    assert ae.detectar_encoding(str(ruta)) == esperado
+
+
+
+@pytest.fixture
+def con_cache(tmp_path, monkeypatch):
+    """CSV de ejemplo con la caché en una carpeta temporal; cuenta las agrupaciones."""
+    monkeypatch.setattr(ae, "CACHE_DIR", str(tmp_path / "cache"))
+    ruta = tmp_path / "datos.csv"
+    ruta.write_bytes(ARCHIVOS["empates"])
+    llamadas = []
+    agrupar_archivo = ae.agrupar_archivo
+
+    def contar_llamadas(archivo_csv):
+        llamadas.append(archivo_csv)
+        return agrupar_archivo(archivo_csv)
+
+    monkeypatch.setattr(ae, "agrupar_archivo", contar_llamadas)
+    return ruta, llamadas
+
+
+def test_cache_repetida_es_acierto(con_cache):
+    ruta, llamadas = con_cache
+    primero = ae.obtener_conteos(str(ruta))
+    segundo = ae.obtener_conteos(str(ruta))
+    assert len(llamadas) == 1
+    assert _normalizar(segundo) == _normalizar(primero) == _esperado(str(ruta))
+
+
+def test_cache_se_rehace_si_cambia_la_fecha(con_cache):
+    ruta, llamadas = con_cache
+    ae.obtener_conteos(str(ruta))
+    info = ruta.stat()
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    assert ae.cargar_cache(str(ruta)) is None
+    ae.obtener_conteos(str(ruta))
+    assert len(llamadas) == 2
+
+
+def test_cache_se_rehace_si_cambia_el_tamano(con_cache):
+    ruta, llamadas = con_cache
+    ae.obtener_conteos(str(ruta))
+    info = ruta.stat()
+    # Misma fecha de modificación, una fila más: solo el tamaño delata el cambio
+    ruta.write_bytes(ARCHIVOS["empates"] + b"Beta,s8,h\n")
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns))
+    assert ae.cargar_cache(str(ruta)) is None
+    categorias, _, n_filas = ae.obtener_conteos(str(ruta))
+    assert len(llamadas) == 2
+    assert (categorias["Beta"], n_filas) == (2, 8)
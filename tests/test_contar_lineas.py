@@ -0,0 +1,33 @@
+"""
+Comprueba que contar_lineas.py cuenta líneas físicas y que el resultado depende
+solo de los bytes del archivo, no de la caché de agrupar_estudios.py.
+"""
+
+import pytest
+
+import agrupar_estudios as ae
+import contar_lineas as cl
+
+
+@pytest.mark.parametrize("contenido, esperado", [
+    (b"", 0),
+    (b"Category,Subcategory\nA,x\nB,y\n", 3),
+    (b"Category,Subcategory\nA,x\nB,y", 3),
+    (b"Category,Subcategory\r\nA,x\r\n", 2),
+    (b"Category,Subcategory\rA,x\rB,y\r", 3),
+    (b'Category,Subcategory,Title\nA,x,"multi\nline"\n\n', 4),
+])
+def test_cuenta_lineas_fisicas(tmp_path, contenido, esperado):
+    ruta = tmp_path / "datos.csv"
+    ruta.write_bytes(contenido)
+    assert cl.contar_lineas_csv(str(ruta)) == esperado
+
+
+def test_no_depende_de_la_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ae, "CACHE_DIR", str(tmp_path / "cache"))
+    ruta = tmp_path / "datos.csv"
+    ruta.write_bytes(b'Category,Subcategory,Title\nA,x,"multi\nline"\n\n')
+    antes = cl.contar_lineas_csv(str(ruta))
+    ae.obtener_conteos(str(ruta))
+    assert ae.cargar_cache(str(ruta)) is not None
+    assert cl.contar_lineas_csv(str(ruta)) == antes
@@ -0,0 +1,203 @@
+"""
+Comprueba que la agrupación con pandas (con y sin pyarrow) da el mismo
+resultado que el recorrido con el módulo csv, incluido el orden de los empates,
+y que las cachés entre ejecuciones se reutilizan solo mientras siguen valiendo.
+"""
+
+import os
+
+import pytest
+
+import grafico_interactivo_html as gi
+
+pytest.importorskip("pandas")
+
+ENCABEZADO = b"Category,Subcategory,TCIM_suitability_level,Title,Author,Year"
+
+ARCHIVOS = {
+    "empates": (
+        ENCABEZADO + b"\n"
+        b"Zeta,s1,High,a,x,2001\nAlpha,s2,Low,b,y,2002\nMid,s3,,c,,\n"
+        b"Beta,s4,High,d,z,2004\nZeta,s5,Low,e,x,2005\nAlpha,s6,High,f,y,2006\n"
+    ),
+    "crlf_en_comillas": (
+        ENCABEZADO + b"\r\n"
+        b'A,x,High,"t\r\nmultil\xc3\xadnea",autor,2000\r\n'
+        b'"B, C", ,Low,"u\r\nv",,\r\n'
+        b"A,x,,w,autor,2001\r\n"
+    ),
+    "columnas_ausentes": b"Title,Category\nt,A\nu,B\nv,A\n",
+    "utf8_invalido": ENCABEZADO + b"\nCaf\xe9,x,High,t,a,1999\nT\xe9,y,Low,u,b,2000\n",
+    "mac_roman": ENCABEZADO + b"\r\nEst\x87ndares,Econ\x97micas,High,t,a,1999\r\n",
+}
+
+
+def _normalizar(resultado):
+    """Convierte los Counter en listas ordenadas como las usa el gráfico."""
+    categorias, subcategorias, estudios, suitability = resultado
+    orden = [cat for cat, _ in categorias.most_common()]
+    return (
+        categorias.most_common(),
+        [subcategorias[cat].most_common() for cat in orden],
+        [dict(suitability[cat]) for cat in orden],
+        [tuple(estudio) for estudio in estudios],
+    )
+
+
+@pytest.fixture(params=sorted(ARCHIVOS))
+def archivo(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(gi, "CACHE_DIR", str(tmp_path / "cache"))
+    ruta = tmp_path / f"{request.param}.csv"
+    ruta.write_bytes(ARCHIVOS[request.param])
+    return str(ruta)
+
+
+def _esperado(archivo):
+    with gi.leer_csv(archivo) as filas:
+        return _normalizar(gi.agrupar_estudios(filas))
+
+
+@pytest.mark.parametrize("con_pyarrow", [False, True])
+def test_pandas_igual_que_csv(archivo, monkeypatch, con_pyarrow):
+    if con_pyarrow:
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(gi, "PYARROW_DISPONIBLE", con_pyarrow)
+    assert _normalizar(gi.agrupar_con_pandas(archivo)) == _esperado(archivo)
+
+
+def test_agrupar_archivo_con_umbral_cero_igual_que_csv(archivo, monkeypatch):
+    monkeypatch.setattr(gi, "UMBRAL_PANDAS_BYTES", 0)
+    assert _normalizar(gi.agrupar_archivo(archivo)) == _esperado(archivo)
+
+
+@pytest.mark.parametrize("umbral", [0, float("inf")])
+def test_mac_roman_sin_caracteres_reemplazados(tmp_path, monkeypatch, umbral):
+    monkeypatch.setattr(gi, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(gi, "UMBRAL_PANDAS_BYTES", umbral)
+    ruta = tmp_path / "mac_roman.csv"
+    ruta.write_bytes(ARCHIVOS["mac_roman"])
+    categorias, subcategorias, _, _ = gi.agrupar_archivo(str(ruta))
+    assert list(categorias) == ["Estándares"]
+    assert list(subcategorias["Estándares"]) == ["Económicas"]
+
+
+def test_csv_del_repositorio_sin_caracteres_reemplazados():
+    ruta = os.path.join(os.path.dirname(__file__), os.pardir, gi.CSV_FILE)
+    with gi.leer_csv(ruta) as filas:
+        _, _, estudios, _ = gi.agrupar_estudios(filas)
+    assert len(estudios) == 195
+    assert not any("\ufffd" in campo for estudio in estudios for campo in estudio)
+
+
+@pytest.fixture
+def con_tabla_cache(tmp_path, monkeypatch):
+    """CSV de ejemplo con la tabla Feather en una carpeta temporal; cuenta las lecturas del CSV."""
+    pa_csv = pytest.importorskip("pyarrow.csv")
+    monkeypatch.setattr(gi, "CACHE_DIR", str(tmp_path / "cache"))
+    ruta = tmp_path / "datos.csv"
+    ruta.write_bytes(ARCHIVOS["empates"])
+    lecturas = []
+    read_csv = pa_csv.read_csv
+
+    def contar_lecturas(*args, **kwargs):
+        lecturas.append(args)
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pa_csv, "read_csv", contar_lecturas)
+    return ruta, lecturas
+
+
+def test_tabla_cache_repetida_es_acierto(con_tabla_cache):
+    ruta, lecturas = con_tabla_cache
+    primero = gi.agrupar_con_pandas(str(ruta))
+    segundo = gi.agrupar_con_pandas(str(ruta))
+    assert len(lecturas) == 1
+    # La tabla leída de vuelta del Feather da lo mismo que el módulo csv
+    assert _normalizar(segundo) == _normalizar(primero) == _esperado(str(ruta))
+
+
+def test_tabla_cache_se_rehace_si_cambia_la_fecha(con_tabla_cache):
+    ruta, lecturas = con_tabla_cache
+    gi.agrupar_con_pandas(str(ruta))
+    info = ruta.stat()
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    gi.agrupar_con_pandas(str(ruta))
+    assert len(lecturas) == 2
+
+
+def test_tabla_cache_se_rehace_si_cambia_el_tamano(con_tabla_cache):
+    ruta, lecturas = con_tabla_cache
+    gi.agrupar_con_pandas(str(ruta))
+    info = ruta.stat()
+    # Misma fecha de modificación, una fila más: solo el tamaño delata el cambio
+    ruta.write_bytes(ARCHIVOS["empates"] + b"Beta,s7,Low,g,z,2007\n")
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns))
+    resultado = gi.agrupar_con_pandas(str(ruta))
+    assert len(lecturas) == 2
+    assert _normalizar(resultado) == _esperado(str(ruta))
+
+
+@pytest.fixture
+def html_generado(tmp_path, monkeypatch):
+    """HTML con su plotly.js y un TSV aparte, y HASH_FILE como lo deja main()."""
+    docs = tmp_path / "docs"
+    (docs / "estudios").mkdir(parents=True)
+    monkeypatch.setattr(gi, "HTML_FILE", str(docs / "grafico_interactivo.html"))
+    monkeypatch.setattr(gi, "HASH_FILE", str(docs / ".grafico_hash"))
+    monkeypatch.setattr(gi, "DIR_ESTUDIOS", str(docs / "estudios"))
+    ruta = tmp_path / "datos.csv"
+    ruta.write_bytes(ARCHIVOS["empates"])
+    firma = gi.firma_csv(str(ruta))
+    archivos = ["plotly-0.0.0.min.js", "estudios/0.tsv"]
+    for archivo in ["grafico_interactivo.html", *archivos]:
+        (docs / archivo).write_text("")
+    (docs / ".grafico_hash").write_text("\n".join([firma, *archivos]))
+    return ruta, docs, firma
+
+
+def test_html_actualizado_con_la_misma_firma(html_generado):
+    ruta, _, firma = html_generado
+    assert gi.firma_csv(str(ruta)) == firma
+    assert gi.html_actualizado(firma)
+
+
+@pytest.mark.parametrize("contenido", [
+    ARCHIVOS["empates"] + b"Beta,s7,Low,g,z,2007\n",
+    ARCHIVOS["empates"].replace(b"Zeta", b"Zota"),
+])
+def test_html_se_rehace_si_cambia_el_csv(html_generado, contenido):
+    ruta, _, firma = html_generado
+    ruta.write_bytes(contenido)
+    assert gi.firma_csv(str(ruta)) != firma
+    assert not gi.html_actualizado(gi.firma_csv(str(ruta)))
+
+
+@pytest.mark.parametrize("archivo", ["grafico_interactivo.html", "plotly-0.0.0.min.js", "estudios/0.tsv"])
+def test_html_se_rehace_si_falta_un_archivo(html_generado, archivo):
+    _, docs, firma = html_generado
+    (docs / archivo).unlink()
+    assert not gi.html_actualizado(firma)
+
+
+def test_main_regenera_si_falta_un_tsv(tmp_path, monkeypatch, capsys):
+    pytest.importorskip("plotly")
+    pytest.importorskip("numpy")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gi, "CSV_FILE", "datos.csv")
+    monkeypatch.setattr(gi, "LIMITE_ESTUDIOS_INLINE", 1)
+    monkeypatch.setattr(gi.sys, "argv", ["grafico_interactivo_html.py"])
+    (tmp_path / "datos.csv").write_bytes(ARCHIVOS["empates"])
+
+    gi.main()
+    generados = gi.archivos_generados()
+    assert "estudios/0.tsv" in generados
+    assert any(archivo.startswith("plotly-") for archivo in generados)
+    capsys.readouterr()
+
+    gi.main()
+    assert "already up to date" in capsys.readouterr().out
+
+    os.remove(os.path.join("docs", "estudios", "0.tsv"))
+    gi.main()
+    assert "generated" in capsys.readouterr().out
+    assert os.path.exists(os.path.join("docs", "estudios", "0.tsv"))